@@ -0,0 +1,44 @@
+"""article author keyset index
+
+Revision ID: 4ece80d1b03c
+Revises: 87c76649540f
+Create Date: 2026-10-18 11:40:27.905113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4ece80d1b03c'
+down_revision: Union[str, None] = '87c76649540f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Постраничная выборка по автору сортирует по (publication_date, id),
+    # составной индекс отдает страницу без сортировки всех статей автора
+    # и полностью заменяет одиночный индекс по author.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_article_author_publication_date_id', 'article',
+            ['author', 'publication_date', 'id'],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_article_author', table_name='article', postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_article_author', 'article', ['author'],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_article_author_publication_date_id', table_name='article',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,43 @@
+"""article filter indexes
+
+Revision ID: 87c76649540f
+Revises: 6a00097e6a54
+Create Date: 2026-10-18 10:12:04.318201
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '87c76649540f'
+down_revision: Union[str, None] = '6a00097e6a54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY не блокирует запись в таблицу, но не работает в транзакции.
+    # Отдельный индекс по publication_date не нужен: поиск по дате использует
+    # левый префикс составного индекса (publication_date, id).
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_article_author', 'article', ['author'],
+            unique=False, postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_article_publication_date_id', 'article', ['publication_date', 'id'],
+            unique=False, postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_article_publication_date_id', table_name='article',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_article_author', table_name='article', postgresql_concurrently=True
+        )
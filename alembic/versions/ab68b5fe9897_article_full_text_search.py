@@ -0,0 +1,47 @@
+"""article full text search
+
+Revision ID: ab68b5fe9897
+Revises: 4ece80d1b03c
+Create Date: 2026-10-18 13:05:51.662840
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'ab68b5fe9897'
+down_revision: Union[str, None] = '4ece80d1b03c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Добавление STORED-колонки перезаписывает таблицу под эксклюзивной блокировкой
+    op.add_column('article', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('russian', title), 'A') || "
+            "setweight(to_tsvector('russian', contents), 'B')",
+            persisted=True,
+        ),
+        nullable=True,
+    ))
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_article_search_vector', 'article', ['search_vector'],
+            unique=False, postgresql_using='gin', postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_article_search_vector', table_name='article',
+            postgresql_concurrently=True,
+        )
+    op.drop_column('article', 'search_vector')
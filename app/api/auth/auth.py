@@ -1,13 +1,61 @@
+import asyncio
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 from jose import jwt
 from passlib.context import CryptContext
 
 from app.api.dao.userdao import UserDAO
-from app.api.exceptions.exceptions import IncorrectNameOrPasswordException
+from app.api.exceptions.exceptions import (
+    IncorrectNameOrPasswordException,
+    ServiceOverloadedException,
+)
 from app.core.config import settings
+from app.logger import logger
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+MAX_BCRYPT_ROUNDS = 16
+
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
+
+
+class BoundedExecutor:
+    """
+    Пул потоков для CPU-тяжелых операций с ограничением очереди:
+    если задач (выполняемых и ожидающих) уже max_pending, отвечаем 503,
+    а не копим запросы, блокируя event loop.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, name: str):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        )
+        self._max_pending = max_pending
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def run(self, func, *args):
+        if self._pending >= self._max_pending:
+            raise ServiceOverloadedException
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+
+
+password_executor = BoundedExecutor(
+    max_workers=settings.BCRYPT_WORKERS,
+    max_pending=settings.BCRYPT_MAX_PENDING,
+    name="bcrypt",
+)
 
 
 def get_password_hash(password: str) -> str:
@@ -18,9 +66,45 @@ def verify_password(plain_password, hashed_password) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def get_password_hash_async(password: str) -> str:
+    return await password_executor.run(get_password_hash, password)
+
+
+async def verify_password_async(plain_password, hashed_password) -> bool:
+    return await password_executor.run(
+        verify_password, plain_password, hashed_password
+    )
+
+
+def tune_bcrypt_rounds(target_ms: int) -> int:
+    """
+    Подбирает стоимость bcrypt под целевую задержку. Каждый раунд удваивает
+    время, поэтому достаточно одного замера на минимальной стоимости.
+    """
+    min_rounds = settings.BCRYPT_MIN_ROUNDS
+    start = time.perf_counter()
+    pwd_context.hash("tune", rounds=min_rounds)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    extra_rounds = int(math.floor(math.log2(target_ms / elapsed_ms)))
+    return min(max(min_rounds + extra_rounds, min_rounds), MAX_BCRYPT_ROUNDS)
+
+
+def configure_password_hashing():
+    if not settings.BCRYPT_TARGET_MS:
+        return
+    rounds = tune_bcrypt_rounds(settings.BCRYPT_TARGET_MS)
+    pwd_context.update(bcrypt__rounds=rounds)
+    logger.info(
+        "Bcrypt cost tuned",
+        extra={"rounds": rounds, "target_ms": settings.BCRYPT_TARGET_MS},
+    )
+
+
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=30)
+    expire = datetime.utcnow() + timedelta(
+        minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
+    )
     to_encode.update({"exp": expire})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, settings.ALGORITHM)
     return encoded_jwt
@@ -28,6 +112,6 @@ def create_access_token(data: dict) -> str:
 
 async def authenticate_user(name: str, password: str):
     user = await UserDAO.find_one_or_none(name=name)
-    if not (user and verify_password(password, user.hashed_password)):
+    if not (user and await verify_password_async(password, user.hashed_password)):
         raise IncorrectNameOrPasswordException
     return user
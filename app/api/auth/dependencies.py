@@ -1,14 +1,13 @@
 from fastapi import Depends, Request
-from jose import ExpiredSignatureError, JWTError, jwt
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.auth.tokens import decode_token
 from app.api.dao.userdao import UserDAO
 from app.api.exceptions.exceptions import (
-    IncorrectTokenFormatException,
     TokenAbsentException,
-    TokenExpiredException,
     UserIsNotPresentException,
 )
-from app.core.config import settings
+from app.db.base import get_session
 
 
 def get_token(request: Request):
@@ -18,17 +17,14 @@ def get_token(request: Request):
     return token
 
 
-async def get_current_user(token: str = Depends(get_token)):
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, settings.ALGORITHM)
-    except ExpiredSignatureError:
-        raise TokenExpiredException
-    except JWTError:
-        raise IncorrectTokenFormatException
+async def get_current_user(
+    token: str = Depends(get_token), session: AsyncSession = Depends(get_session)
+):
+    payload = decode_token(token)
     name: str = payload.get("sub")
     if not name:
         raise UserIsNotPresentException
-    user = await UserDAO.find_one_or_none(name=name)
+    user = await UserDAO.find_cached(name, session=session)
     if not user:
         raise UserIsNotPresentException
 
@@ -0,0 +1,259 @@
+"""
+Сессии пользователей в Redis: обновление токена доступа через /refresh
+без пароля и bcrypt.
+
+Токен обновления - "<id сессии>.<секрет>", в Redis хранится только SHA-256
+секрета. Каждое обновление выдает новый секрет (ротация). Если предъявлен
+уже замененный секрет, токен украден или использован дважды, и сессия
+отзывается целиком.
+
+Токен доступа отозванной сессии действует до своего exp, поэтому его срок
+остается коротким (ACCESS_TOKEN_EXPIRE_MINUTES).
+"""
+import hashlib
+import hmac
+import secrets
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from redis.exceptions import RedisError, WatchError
+
+from app.api.exceptions.exceptions import (
+    RefreshTokenInvalidException,
+    SessionStoreUnavailableException,
+)
+from app.cache.backend import get_redis, redis_key
+from app.core.config import settings
+from app.logger import logger
+
+REFRESH_COOKIE = "my_journal_refresh_token"
+MAX_USER_AGENT_LENGTH = 256
+
+
+def _session_key(session_id: str) -> str:
+    return redis_key("session", session_id)
+
+
+def _user_sessions_key(user_name: str) -> str:
+    return redis_key("user_sessions", user_name)
+
+
+def _hash(secret: str) -> str:
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+
+def refresh_token_expire() -> int:
+    return settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+
+
+def parse_refresh_token(token: str) -> tuple[str, str]:
+    session_id, _, secret = token.partition(".")
+    if not session_id or not secret:
+        raise RefreshTokenInvalidException
+    return session_id, secret
+
+
+async def _delete_sessions(redis, user_name: str, session_ids: list) -> None:
+    if not session_ids:
+        return
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.delete(*(_session_key(session_id) for session_id in session_ids))
+        pipe.zrem(_user_sessions_key(user_name), *session_ids)
+        await pipe.execute()
+
+
+async def _trim_sessions(redis, user_name: str) -> None:
+    # Старые сессии вытесняются, чтобы вход в цикле не копил их без предела
+    key = _user_sessions_key(user_name)
+    excess = await redis.zcard(key) - settings.MAX_SESSIONS_PER_USER
+    if excess > 0:
+        oldest = await redis.zrange(key, 0, excess - 1)
+        await _delete_sessions(redis, user_name, [id.decode() for id in oldest])
+
+
+async def create_session(user_name: str, user_agent: str = "") -> Optional[str]:
+    """
+    Новая сессия пользователя и ее токен обновления. Без Redis возвращает
+    None: вход работает, но токен придется получать заново через /login.
+    """
+    redis = get_redis()
+    if redis is None:
+        return None
+    session_id, secret = uuid.uuid4().hex, secrets.token_urlsafe(32)
+    now, expire = time.time(), refresh_token_expire()
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                _session_key(session_id),
+                mapping={
+                    "user": user_name,
+                    "token_hash": _hash(secret),
+                    "created": now,
+                    "last_used": now,
+                    "user_agent": user_agent[:MAX_USER_AGENT_LENGTH],
+                },
+            )
+            pipe.expire(_session_key(session_id), expire)
+            pipe.zadd(_user_sessions_key(user_name), {session_id: now})
+            pipe.expire(_user_sessions_key(user_name), expire)
+            await pipe.execute()
+        await _trim_sessions(redis, user_name)
+    except RedisError:
+        logger.warning(
+            "Cannot create session", extra={"user": user_name}, exc_info=True
+        )
+        return None
+    return f"{session_id}.{secret}"
+
+
+async def rotate_session(token: str, user_agent: str = "") -> tuple[str, str]:
+    """
+    Проверяет токен обновления и заменяет его секрет.\n
+    Returns:\n
+        :return: Имя пользователя и новый токен обновления
+    Raises:\n
+        :raises 401: Сессии нет, она истекла или токен уже был использован.
+    """
+    session_id, secret = parse_refresh_token(token)
+    redis = get_redis()
+    if redis is None:
+        raise RefreshTokenInvalidException
+    key = _session_key(session_id)
+    new_secret = secrets.token_urlsafe(32)
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            # Параллельное обновление тем же токеном изменит сессию,
+            # и execute ниже завершится WatchError
+            await pipe.watch(key)
+            stored = await pipe.hgetall(key)
+            if not stored:
+                raise RefreshTokenInvalidException
+            user_name = stored[b"user"].decode()
+            if not hmac.compare_digest(stored[b"token_hash"].decode(), _hash(secret)):
+                logger.warning(
+                    "Refresh token reused, session revoked",
+                    extra={"user": user_name, "session": session_id},
+                )
+                await _delete_sessions(redis, user_name, [session_id])
+                raise RefreshTokenInvalidException
+            pipe.multi()
+            pipe.hset(
+                key,
+                mapping={
+                    "token_hash": _hash(new_secret),
+                    "last_used": time.time(),
+                    "user_agent": user_agent[:MAX_USER_AGENT_LENGTH],
+                },
+            )
+            pipe.expire(key, refresh_token_expire())
+            pipe.expire(_user_sessions_key(user_name), refresh_token_expire())
+            await pipe.execute()
+    except WatchError:
+        raise RefreshTokenInvalidException
+    except RedisError:
+        logger.warning("Cannot refresh session", exc_info=True)
+        raise RefreshTokenInvalidException
+    return user_name, f"{session_id}.{new_secret}"
+
+
+async def list_sessions(user_name: str, current_token: Optional[str] = None) -> list:
+    """Сессии пользователя; пустой список, если Redis недоступен"""
+    redis = get_redis()
+    if redis is None:
+        return []
+    current_id = current_token.partition(".")[0] if current_token else None
+    key = _user_sessions_key(user_name)
+    try:
+        session_ids = [id.decode() for id in await redis.zrange(key, 0, -1)]
+        async with redis.pipeline(transaction=False) as pipe:
+            for session_id in session_ids:
+                pipe.hgetall(_session_key(session_id))
+            stored_sessions = await pipe.execute()
+    except RedisError:
+        logger.warning("Cannot list sessions", extra={"user": user_name}, exc_info=True)
+        return []
+
+    sessions, expired = [], []
+    for session_id, stored in zip(session_ids, stored_sessions):
+        if not stored:
+            expired.append(session_id)
+            continue
+        sessions.append(
+            {
+                "id": session_id,
+                "created": datetime.fromtimestamp(
+                    float(stored[b"created"]), timezone.utc
+                ),
+                "last_used": datetime.fromtimestamp(
+                    float(stored[b"last_used"]), timezone.utc
+                ),
+                "user_agent": stored[b"user_agent"].decode(),
+                "current": session_id == current_id,
+            }
+        )
+    if expired:
+        try:
+            await redis.zrem(key, *expired)
+        except RedisError:
+            logger.warning("Cannot remove expired sessions", exc_info=True)
+    return sessions
+
+
+async def revoke_session(user_name: str, session_id: str) -> bool:
+    """
+    Отзывает сессию пользователя; False, если у него нет такой сессии.
+    Ошибка Redis - 503: молча оставить сессию действующей нельзя.
+    """
+    redis = get_redis()
+    if redis is None:
+        return False
+    try:
+        if await redis.zscore(_user_sessions_key(user_name), session_id) is None:
+            return False
+        await _delete_sessions(redis, user_name, [session_id])
+    except RedisError:
+        logger.warning(
+            "Cannot revoke session", extra={"user": user_name}, exc_info=True
+        )
+        raise SessionStoreUnavailableException
+    return True
+
+
+async def revoke_all_sessions(user_name: str) -> None:
+    """Отзывает все сессии пользователя, ошибка Redis - 503"""
+    redis = get_redis()
+    if redis is None:
+        return
+    try:
+        session_ids = await redis.zrange(_user_sessions_key(user_name), 0, -1)
+        await _delete_sessions(redis, user_name, [id.decode() for id in session_ids])
+    except RedisError:
+        logger.warning(
+            "Cannot revoke sessions", extra={"user": user_name}, exc_info=True
+        )
+        raise SessionStoreUnavailableException
+
+
+async def revoke_by_token(token: str) -> None:
+    """
+    Выход: отзывает сессию предъявленного токена, если его секрет совпадает
+    с сохраненным - по одному id чужую сессию не отозвать. Ошибки не важны.
+    """
+    redis = get_redis()
+    if redis is None:
+        return
+    try:
+        session_id, secret = parse_refresh_token(token)
+    except RefreshTokenInvalidException:
+        return
+    try:
+        stored = await redis.hmget(_session_key(session_id), "user", "token_hash")
+        user_name, token_hash = stored
+        if user_name is None or token_hash is None:
+            return
+        if hmac.compare_digest(token_hash.decode(), _hash(secret)):
+            await _delete_sessions(redis, user_name.decode(), [session_id])
+    except RedisError:
+        logger.warning("Cannot revoke session", exc_info=True)
@@ -0,0 +1,131 @@
+"""
+Проверка токенов доступа: сменная реализация проверки JWT (JWT_VERIFIER)
+и кэш проверенных токенов в памяти процесса.
+
+Кэш хранит claims по SHA-256 токена не дольше exp, поэтому повторный
+запрос с тем же токеном не проверяет подпись заново.
+"""
+import base64
+import hashlib
+import hmac
+import time
+from typing import Optional
+
+import orjson
+from jose import ExpiredSignatureError, JWTError, jwt
+
+from app.api.exceptions.exceptions import (
+    IncorrectTokenFormatException,
+    TokenExpiredException,
+)
+from app.cache.local import LocalTTLCache
+from app.core.config import settings
+
+
+class JoseVerifier:
+    def __init__(self, key: str, algorithm: str):
+        self._key, self._algorithm = key, algorithm
+
+    def decode(self, token: str) -> dict:
+        try:
+            return jwt.decode(token, self._key, self._algorithm)
+        except ExpiredSignatureError:
+            raise TokenExpiredException
+        except JWTError:
+            raise IncorrectTokenFormatException
+
+
+class PyJWTVerifier:
+    def __init__(self, key: str, algorithm: str):
+        import jwt as pyjwt
+
+        self._jwt, self._key, self._algorithms = pyjwt, key, [algorithm]
+
+    def decode(self, token: str) -> dict:
+        try:
+            return self._jwt.decode(token, self._key, algorithms=self._algorithms)
+        except self._jwt.ExpiredSignatureError:
+            raise TokenExpiredException
+        except self._jwt.InvalidTokenError:
+            raise IncorrectTokenFormatException
+
+
+class HmacVerifier:
+    """
+    Проверка HS256/HS384/HS512 на hmac и orjson без сторонних библиотек.
+    Из claims проверяются только exp и nbf - других мы не выдаем.
+    """
+
+    HASHES = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+
+    def __init__(self, key: str, algorithm: str):
+        if algorithm not in self.HASHES:
+            raise ValueError(f"hmac verifier does not support {algorithm}")
+        self._key, self._algorithm = key.encode(), algorithm
+        self._hash = self.HASHES[algorithm]
+
+    @staticmethod
+    def _b64decode(data: str) -> bytes:
+        return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+    def decode(self, token: str) -> dict:
+        try:
+            signing_input, _, signature = token.rpartition(".")
+            header, _, payload = signing_input.partition(".")
+            if orjson.loads(self._b64decode(header)).get("alg") != self._algorithm:
+                raise IncorrectTokenFormatException
+            expected = hmac.new(self._key, signing_input.encode(), self._hash)
+            if not hmac.compare_digest(expected.digest(), self._b64decode(signature)):
+                raise IncorrectTokenFormatException
+            claims = orjson.loads(self._b64decode(payload))
+        except (ValueError, AttributeError):
+            # Ошибки base64, JSON и не-ASCII символы в токене
+            raise IncorrectTokenFormatException
+        if not isinstance(claims, dict):
+            raise IncorrectTokenFormatException
+        now = time.time()
+        for claim in ("exp", "nbf"):
+            if not isinstance(claims.get(claim, 0), (int, float)):
+                raise IncorrectTokenFormatException
+        if "exp" in claims and claims["exp"] < now:
+            raise TokenExpiredException
+        if "nbf" in claims and claims["nbf"] > now:
+            raise IncorrectTokenFormatException
+        return claims
+
+
+VERIFIERS = {"jose": JoseVerifier, "pyjwt": PyJWTVerifier, "hmac": HmacVerifier}
+
+
+def get_token_verifier(name: Optional[str] = None):
+    verifier = VERIFIERS[name or settings.JWT_VERIFIER]
+    return verifier(settings.SECRET_KEY, settings.ALGORITHM)
+
+
+token_verifier = get_token_verifier()
+
+token_cache = LocalTTLCache(
+    maxsize=settings.TOKEN_CACHE_MAXSIZE, ttl=settings.TOKEN_CACHE_TTL
+)
+
+
+def decode_token(token: str) -> dict:
+    """
+    Claims токена доступа. Кэшируются только успешно проверенные токены,
+    запись живет не дольше срока действия токена.
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    claims = token_cache.get(digest)
+    now = time.time()
+    if claims is not None:
+        if claims.get("exp", now) < now:
+            token_cache.delete(digest)
+            raise TokenExpiredException
+        return claims
+    claims = token_verifier.decode(token)
+    ttl = settings.TOKEN_CACHE_TTL
+    if "exp" in claims:
+        ttl = min(ttl, claims["exp"] - now)
+    if ttl > 0:
+        token_cache.set(digest, claims, ttl=ttl)
+    return claims
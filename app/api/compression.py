@@ -0,0 +1,49 @@
+"""
+Сжатие ответов: выбор кодировки по Accept-Encoding и сжатие тела.
+Сжатый вариант ответа сохраняется в кэше (app.cache.variants), поэтому
+уровни сжатия высокие: тело сжимается один раз на версию коллекции.
+"""
+import gzip
+from typing import Optional
+
+import zstandard
+
+from app.core.config import settings
+
+GZIP_LEVEL = 9
+ZSTD_LEVEL = 12
+BROTLI_QUALITY = 9
+
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Кодировка из RESPONSE_COMPRESSION_ENCODINGS с наибольшим q в заголовке
+    клиента, при равных q - по порядку в настройках. None - без сжатия.
+    """
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        params = params.strip()
+        try:
+            weight = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            weight = 0.0
+        weights[name.strip().lower()] = weight
+    best, best_weight = None, 0.0
+    for encoding in settings.RESPONSE_COMPRESSION_ENCODINGS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        import brotli
+
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
@@ -1,31 +1,109 @@
 import datetime
+import html
+from typing import AsyncIterator, Optional
 
-from sqlalchemy import delete, insert, select, update
+from sqlalchemy import (
+    Integer,
+    any_,
+    bindparam,
+    delete,
+    func,
+    insert,
+    literal_column,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.models.article import Article
-from app.db.base import BaseDAO, async_session_maker
+from app.api.models.article import SEARCH_CONFIG, Article
+from app.cache.tags import article_write_tags, invalidate_tags
+from app.cache.versions import ARTICLES_COLLECTION, bump_version
+from app.db.base import (
+    BaseDAO,
+    after_commit,
+    async_session_maker,
+    commit,
+    session_scope,
+)
 from app.logger import logger
 
 
+# Границы совпадений в ts_headline: управляющие символы, которых нет в HTML.
+# Фрагмент экранируется в Python, и только потом они заменяются на <b>.
+HIGHLIGHT_START, HIGHLIGHT_STOP = "\x02", "\x03"
+HEADLINE_OPTIONS = (
+    f'StartSel="{HIGHLIGHT_START}", StopSel="{HIGHLIGHT_STOP}", '
+    "MaxFragments=2, MaxWords=30, MinWords=10"
+)
+
+
+def highlight_snippet(snippet: str) -> str:
+    """
+    ts_headline возвращает исходный текст статьи как есть, поэтому перед
+    выделением совпадений тегом <b> фрагмент экранируется: разметка в тексте
+    статьи не должна исполниться у клиента.
+    """
+    return (
+        html.escape(snippet)
+        .replace(HIGHLIGHT_START, "<b>")
+        .replace(HIGHLIGHT_STOP, "</b>")
+    )
+
+
+# Больше строк за один запрос keyset-пагинации не отдаем: выборки по автору
+# и дате без явного limit не должны читать всю таблицу
+MAX_CURSOR_LIMIT = 1000
+
+
 class ArticleDAO(BaseDAO):
     model = Article
 
     @classmethod
-    async def find_all(cls):
+    async def stream_all(cls, batch_size: int = 1000) -> AsyncIterator[list]:
+        """
+        Отдает все статьи пачками по batch_size строк через серверный курсор,
+        не загружая таблицу в память целиком.
+        """
         async with async_session_maker() as session:
-            query = select(cls.model)
-            result = await session.execute(query)
-            return result.scalars().all()
+            query = select(*cls.columns()).order_by(cls.model.id)
+            result = await session.stream(
+                query, execution_options={"yield_per": batch_size}
+            )
+            async for partition in result.mappings().partitions(batch_size):
+                yield partition
 
     @classmethod
-    async def add_article(cls, **data) -> Article:
+    async def invalidate_cached(cls, tags: set):
+        """
+        Удаляет затронутые записью ключи кэша и только после этого меняет
+        версию коллекции: новый ETag не должен достаться старому телу ответа.
+        """
+        if not tags:
+            return
+        await invalidate_tags(tags)
+        await bump_version(ARTICLES_COLLECTION)
+
+    @classmethod
+    async def add_article(
+        cls, session: Optional[AsyncSession] = None, **data
+    ) -> Article:
         try:
             query = insert(cls.model).values(**data).returning(cls.model)
-            async with async_session_maker() as session:
+            async with session_scope(session) as session:
                 result = await session.execute(query)
-                await session.commit()
-                return result.scalars().first()
+                article = result.scalars().first()
+                await commit(session)
+            await after_commit(
+                session,
+                cls.invalidate_cached,
+                article_write_tags(
+                    article.id, article.author, article.publication_date, inserted=True
+                ),
+            )
+            return article
         except (SQLAlchemyError, Exception) as e:
             if isinstance(e, SQLAlchemyError):
                 msg = "Database Exc: Cannot insert data into table"
@@ -36,17 +114,29 @@ class ArticleDAO(BaseDAO):
             return None
 
     @classmethod
-    async def update_article(cls, article_id: int, article_data: dict):
+    async def update_article(
+        cls,
+        article_id: int,
+        article_data: dict,
+        session: Optional[AsyncSession] = None,
+    ):
         try:
-            async with async_session_maker() as session:
+            async with session_scope(session) as session:
                 query = (
                     update(cls.model)
                     .where(cls.model.id == article_id)
                     .values(**article_data)
+                    .returning(
+                        cls.model.id, cls.model.author, cls.model.publication_date
+                    )
                 )
                 result = await session.execute(query)
-                await session.commit()
-                return result
+                await commit(session)
+            tags = set()
+            for row in result.all():
+                tags |= article_write_tags(*row)
+            await after_commit(session, cls.invalidate_cached, tags)
+            return result
         except (SQLAlchemyError, Exception) as e:
             if isinstance(e, SQLAlchemyError):
                 msg = "Database Exc: Cannot update data in table"
@@ -54,33 +144,381 @@ class ArticleDAO(BaseDAO):
                 msg = "Unknown Exc: Cannot update data in table"
             logger.error(msg, extra={"table": cls.model.__tablename__}, exc_info=True)
 
+    @classmethod
+    async def get_articles_paginated(
+        cls,
+        offset: int,
+        limit: int,
+        session: Optional[AsyncSession] = None,
+        columns: Optional[list] = None,
+    ) -> list:
+        async with session_scope(session) as session:
+            query = (
+                select(*(columns or cls.columns()))
+                .order_by(cls.model.id)
+                .offset(offset)
+                .limit(limit)
+            )
+            result = await session.execute(query)
+            return result.mappings().all()
 
     @classmethod
-    async def get_articles_paginated(cls, offset: int, limit: int) -> list[Article]:
-        async with async_session_maker() as session:
-            query = select(cls.model).offset(offset).limit(limit)
+    async def get_articles_by_cursor(
+        cls,
+        limit: int = MAX_CURSOR_LIMIT,
+        after: Optional[tuple[datetime.date, int]] = None,
+        session: Optional[AsyncSession] = None,
+        columns: Optional[list] = None,
+        **filter_by,
+    ) -> list:
+        """
+        Keyset-пагинация: статьи упорядочены по (publication_date, id) от новых
+        к старым, следующая страница начинается строго после позиции `after`.
+        limit не больше MAX_CURSOR_LIMIT.
+        """
+        async with session_scope(session) as session:
+            query = (
+                select(*(columns or cls.columns()))
+                .filter_by(**filter_by)
+                .order_by(cls.model.publication_date.desc(), cls.model.id.desc())
+            )
+            if after is not None:
+                query = query.where(
+                    tuple_(cls.model.publication_date, cls.model.id) < tuple_(*after)
+                )
+            query = query.limit(min(limit, MAX_CURSOR_LIMIT))
             result = await session.execute(query)
-            return result.scalars().all()
+            return result.mappings().all()
 
     @classmethod
-    async def find_by_date(cls, publication_date: datetime) -> list[Article]:
-        async with async_session_maker() as session:
-            query = select(cls.model).where(
-                cls.model.publication_date == publication_date
+    def summary_columns(cls, excerpt_length: Optional[int] = None) -> list:
+        """
+        Колонки списков статей без текста. Отрывок считается в БД через substr,
+        которому достаточно прочитать из TOAST начало текста, а не весь текст.
+        """
+        columns = [
+            cls.model.id,
+            cls.model.title,
+            cls.model.publication_date,
+            cls.model.author,
+        ]
+        if excerpt_length:
+            columns.append(
+                func.substr(cls.model.contents, 1, excerpt_length).label("excerpt")
             )
+        return columns
+
+    @classmethod
+    async def find_summaries(
+        cls,
+        excerpt_length: Optional[int] = None,
+        session: Optional[AsyncSession] = None,
+    ) -> list:
+        async with session_scope(session) as session:
+            query = select(*cls.summary_columns(excerpt_length)).order_by(cls.model.id)
             result = await session.execute(query)
-            return result.scalars().all()
+            return result.mappings().all()
 
     @classmethod
-    async def find_by_author(cls, author_name: str) -> list[Article]:
-        async with async_session_maker() as session:
-            query = select(cls.model).where(cls.model.author == author_name)
+    async def get_summaries_paginated(
+        cls,
+        offset: int,
+        limit: int,
+        excerpt_length: Optional[int] = None,
+        session: Optional[AsyncSession] = None,
+    ) -> list:
+        return await cls.get_articles_paginated(
+            offset,
+            limit,
+            session=session,
+            columns=cls.summary_columns(excerpt_length),
+        )
+
+    @classmethod
+    async def get_summaries_by_cursor(
+        cls,
+        limit: int = MAX_CURSOR_LIMIT,
+        after: Optional[tuple[datetime.date, int]] = None,
+        excerpt_length: Optional[int] = None,
+        session: Optional[AsyncSession] = None,
+        **filter_by,
+    ) -> list:
+        return await cls.get_articles_by_cursor(
+            limit,
+            after,
+            session=session,
+            columns=cls.summary_columns(excerpt_length),
+            **filter_by,
+        )
+
+    @classmethod
+    async def find_by_date(
+        cls,
+        publication_date: datetime,
+        limit: int = MAX_CURSOR_LIMIT,
+        after: Optional[tuple[datetime.date, int]] = None,
+        session: Optional[AsyncSession] = None,
+    ) -> list:
+        return await cls.get_articles_by_cursor(
+            limit=limit, after=after, session=session, publication_date=publication_date
+        )
+
+    @classmethod
+    async def find_by_author(
+        cls,
+        author_name: str,
+        limit: int = MAX_CURSOR_LIMIT,
+        after: Optional[tuple[datetime.date, int]] = None,
+        session: Optional[AsyncSession] = None,
+    ) -> list:
+        return await cls.get_articles_by_cursor(
+            limit=limit, after=after, session=session, author=author_name
+        )
+
+    @classmethod
+    async def search(
+        cls,
+        text_query: str,
+        offset: int,
+        limit: int,
+        session: Optional[AsyncSession] = None,
+    ) -> list:
+        """
+        Полнотекстовый поиск по заголовку и тексту через GIN-индекс по
+        search_vector. Результаты упорядочены по релевантности, фрагменты
+        с подсветкой строятся только для статей текущей страницы.
+        """
+        config = literal_column(f"'{SEARCH_CONFIG}'::regconfig")
+        ts_query = func.websearch_to_tsquery(config, text_query)
+        ranked = (
+            select(
+                cls.model.id,
+                cls.model.title,
+                cls.model.contents,
+                cls.model.publication_date,
+                cls.model.author,
+                func.ts_rank_cd(cls.model.search_vector, ts_query).label("rank"),
+            )
+            .where(cls.model.search_vector.op("@@")(ts_query))
+            .order_by(literal_column("rank").desc(), cls.model.id.desc())
+            .offset(offset)
+            .limit(limit)
+            .subquery()
+        )
+        query = select(
+            ranked.c.id,
+            ranked.c.title,
+            ranked.c.publication_date,
+            ranked.c.author,
+            ranked.c.rank,
+            func.ts_headline(
+                config,
+                ranked.c.contents,
+                ts_query,
+                HEADLINE_OPTIONS,
+            ).label("snippet"),
+        ).order_by(ranked.c.rank.desc(), ranked.c.id.desc())
+        async with session_scope(session) as session:
             result = await session.execute(query)
-            return result.scalars().all()
+            return [
+                {**row, "snippet": highlight_snippet(row["snippet"])}
+                for row in result.mappings()
+            ]
 
     @classmethod
-    async def delete(cls, **filter_by):
-        async with async_session_maker() as session:
-            query = delete(cls.model).filter_by(**filter_by)
-            await session.execute(query)
-            await session.commit()
+    async def delete(cls, session: Optional[AsyncSession] = None, **filter_by):
+        async with session_scope(session) as session:
+            query = (
+                delete(cls.model)
+                .filter_by(**filter_by)
+                .returning(cls.model.id, cls.model.author, cls.model.publication_date)
+            )
+            result = await session.execute(query)
+            await commit(session)
+        tags = set()
+        for row in result.all():
+            tags |= article_write_tags(*row, deleted=True)
+        await after_commit(session, cls.invalidate_cached, tags)
+
+    @classmethod
+    async def add_articles(
+        cls, articles: list[dict], session: Optional[AsyncSession] = None
+    ) -> Optional[list]:
+        """
+        Вставляет все статьи одним INSERT ... VALUES (...), (...) RETURNING.
+        """
+        try:
+            query = (
+                insert(cls.model).values(articles).returning(*cls.columns())
+            )
+            async with session_scope(session) as session:
+                result = await session.execute(query)
+                new_articles = result.mappings().all()
+                await commit(session)
+        except (SQLAlchemyError, Exception) as e:
+            if isinstance(e, SQLAlchemyError):
+                msg = "Database Exc: Cannot insert data into table"
+            elif isinstance(e, Exception):
+                msg = "Unknown Exc: Cannot insert data into table"
+
+            logger.error(msg, extra={"table": cls.model.__tablename__}, exc_info=True)
+            return None
+        tags = set()
+        for article in new_articles:
+            tags |= article_write_tags(
+                article["id"],
+                article["author"],
+                article["publication_date"],
+                inserted=True,
+            )
+        await after_commit(session, cls.invalidate_cached, tags)
+        return new_articles
+
+    @classmethod
+    async def update_articles(
+        cls,
+        articles: list[dict],
+        user_name: str,
+        is_admin: bool,
+        session: Optional[AsyncSession] = None,
+    ) -> dict[int, str]:
+        """
+        Обновляет статьи в одной транзакции: авторы проверяются одним
+        SELECT ... FOR UPDATE, разрешенные строки обновляются одним
+        executemany по первичному ключу.
+
+        :return: Статус для каждого id: updated, not_found или forbidden.
+        """
+        ids = [article["id"] for article in articles]
+        async with session_scope(session) as session:
+            query = (
+                select(cls.model.id, cls.model.author, cls.model.publication_date)
+                .where(
+                    cls.model.id == any_(bindparam("ids", ids, type_=ARRAY(Integer)))
+                )
+                .with_for_update()
+            )
+            existing = {row.id: row for row in (await session.execute(query)).all()}
+            statuses, allowed = {}, []
+            for article in articles:
+                row = existing.get(article["id"])
+                if row is None:
+                    statuses[article["id"]] = "not_found"
+                elif row.author == user_name or is_admin:
+                    statuses[article["id"]] = "updated"
+                    allowed.append(article)
+                else:
+                    statuses[article["id"]] = "forbidden"
+            if allowed:
+                await session.execute(update(cls.model), allowed)
+            await commit(session)
+
+        tags = set()
+        for article in allowed:
+            tags |= article_write_tags(*existing[article["id"]])
+        await after_commit(session, cls.invalidate_cached, tags)
+        return statuses
+
+    @classmethod
+    async def delete_articles(
+        cls,
+        ids: list[int],
+        user_name: str,
+        is_admin: bool,
+        session: Optional[AsyncSession] = None,
+    ) -> dict[int, str]:
+        """
+        Удаляет статьи одним DELETE ... WHERE id = ANY(...) с проверкой автора
+        в том же запросе. Для неудаленных id один запрос отличает
+        отсутствующие статьи от чужих.
+
+        :return: Статус для каждого id: deleted, not_found или forbidden.
+        """
+        async with session_scope(session) as session:
+            query = delete(cls.model).where(
+                cls.model.id == any_(bindparam("ids", ids, type_=ARRAY(Integer)))
+            )
+            if not is_admin:
+                query = query.where(cls.model.author == user_name)
+            query = query.returning(
+                cls.model.id, cls.model.author, cls.model.publication_date
+            )
+            deleted = (await session.execute(query)).all()
+            deleted_ids = {row.id for row in deleted}
+            existing_ids = await cls._existing_ids(
+                session, [i for i in ids if i not in deleted_ids]
+            )
+            await commit(session)
+
+        tags = set()
+        for row in deleted:
+            tags |= article_write_tags(*row, deleted=True)
+        await after_commit(session, cls.invalidate_cached, tags)
+        statuses = {}
+        for article_id in ids:
+            if article_id in deleted_ids:
+                statuses[article_id] = "deleted"
+            elif article_id in existing_ids:
+                statuses[article_id] = "forbidden"
+            else:
+                statuses[article_id] = "not_found"
+        return statuses
+
+    @classmethod
+    async def update_article_checked(
+        cls,
+        article_id: int,
+        article_data: dict,
+        user_name: str,
+        is_admin: bool,
+        session: Optional[AsyncSession] = None,
+    ) -> str:
+        """
+        Обновляет статью одним UPDATE с проверкой автора в WHERE. Лишний
+        запрос на существование статьи делается только если ничего не обновлено.
+
+        :return: updated, not_found или forbidden.
+        """
+        async with session_scope(session) as session:
+            query = (
+                update(cls.model)
+                .where(cls.model.id == article_id)
+                .values(**article_data)
+                .returning(cls.model.id, cls.model.author, cls.model.publication_date)
+            )
+            if not is_admin:
+                query = query.where(cls.model.author == user_name)
+            updated = (await session.execute(query)).first()
+            if updated is None:
+                exists = await cls._existing_ids(session, [article_id])
+                return "forbidden" if exists else "not_found"
+            await commit(session)
+        await after_commit(
+            session, cls.invalidate_cached, article_write_tags(*updated)
+        )
+        return "updated"
+
+    @classmethod
+    async def delete_article_checked(
+        cls,
+        article_id: int,
+        user_name: str,
+        is_admin: bool,
+        session: Optional[AsyncSession] = None,
+    ) -> str:
+        """
+        :return: deleted, not_found или forbidden.
+        """
+        statuses = await cls.delete_articles(
+            [article_id], user_name, is_admin, session=session
+        )
+        return statuses[article_id]
+
+    @classmethod
+    async def _existing_ids(cls, session, ids: list[int]) -> set:
+        if not ids:
+            return set()
+        query = select(cls.model.id).where(
+            cls.model.id == any_(bindparam("ids", ids, type_=ARRAY(Integer)))
+        )
+        return set((await session.execute(query)).scalars().all())
@@ -0,0 +1,45 @@
+import base64
+import binascii
+from datetime import date
+
+# id статьи - integer Postgres: курсор с большим id уронил бы запрос
+MAX_ARTICLE_ID = 2**31 - 1
+
+
+def encode_cursor(publication_date: date, article_id: int) -> str:
+    """
+    Кодирует позицию последней статьи страницы в непрозрачный курсор.
+    """
+    raw = f"{publication_date.isoformat()}:{article_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[date, int]:
+    """
+    Декодирует курсор в пару (publication_date, id).
+
+    :raises ValueError: Если курсор поврежден или имеет неверный формат.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        publication_date, article_id = raw.split(":")
+        publication_date = date.fromisoformat(publication_date)
+        article_id = int(article_id)
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not 0 < article_id <= MAX_ARTICLE_ID:
+        raise ValueError("Invalid cursor")
+    return publication_date, article_id
+
+
+def make_page(articles: list, per_page: int) -> dict:
+    """
+    Собирает страницу из выборки на per_page + 1 статей: лишняя статья
+    означает, что есть следующая страница.
+    """
+    next_cursor = None
+    if len(articles) > per_page:
+        articles = articles[:per_page]
+        last = articles[-1]
+        next_cursor = encode_cursor(last["publication_date"], last["id"])
+    return {"items": articles, "next_cursor": next_cursor}
@@ -1,22 +1,43 @@
-from sqlalchemy import insert
+from typing import Optional
+
+from sqlalchemy import insert, update
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.models.schemas import SUser
 from app.api.models.user import User
-from app.db.base import BaseDAO, async_session_maker
+from app.cache.backend import get_redis, redis_key
+from app.cache.l1 import publish_invalidation, register_local_cache
+from app.cache.local import LocalTTLCache
+from app.core.config import settings
+from app.db.base import BaseDAO, after_commit, commit, session_scope
 from app.logger import logger
 
+USERS_CACHE = "users"
+
+# Первый уровень кэша пользователей - память процесса. Изменения через
+# UserDAO удаляются из кэша всех воркеров через канал инвалидаций
+# (app.cache.l1). Изменения в обход DAO, например UPDATE в psql, станут
+# видны не позже чем через USER_CACHE_TTL секунд.
+user_cache = LocalTTLCache(
+    maxsize=settings.USER_CACHE_MAXSIZE, ttl=settings.USER_CACHE_TTL
+)
+register_local_cache(USERS_CACHE, user_cache)
+
 
 class UserDAO(BaseDAO):
     model = User
 
     @classmethod
-    async def add_user(cls, **data):
+    async def add_user(cls, session: Optional[AsyncSession] = None, **data):
         try:
             query = insert(cls.model).values(**data).returning(cls.model.name)
-            async with async_session_maker() as session:
+            async with session_scope(session) as session:
                 result = await session.execute(query)
-                await session.commit()
-                return result.mappings().first()
+                new_user = result.mappings().first()
+                await commit(session)
+            await after_commit(session, cls.invalidate_cached, data["name"])
+            return new_user
         except (SQLAlchemyError, Exception) as e:
             if isinstance(e, SQLAlchemyError):
                 msg = "Database Exc: Cannot add user"
@@ -25,3 +46,84 @@ class UserDAO(BaseDAO):
 
             logger.error(msg, extra={"table": cls.model.__tablename__}, exc_info=True)
             return None
+
+    @classmethod
+    async def update_user(
+        cls, name: str, session: Optional[AsyncSession] = None, **data
+    ):
+        """
+        Изменяет пользователя, например роль. Роли меняйте только через этот
+        метод: он удаляет пользователя из кэшей всех воркеров, и
+        get_current_user сразу видит новую роль.
+        """
+        try:
+            query = (
+                update(cls.model)
+                .where(cls.model.name == name)
+                .values(**data)
+                .returning(cls.model.name)
+            )
+            async with session_scope(session) as session:
+                result = await session.execute(query)
+                updated_user = result.mappings().first()
+                await commit(session)
+            await after_commit(session, cls.invalidate_cached, name)
+            return updated_user
+        except (SQLAlchemyError, Exception) as e:
+            if isinstance(e, SQLAlchemyError):
+                msg = "Database Exc: Cannot update user"
+            elif isinstance(e, Exception):
+                msg = "Unknown Exc: Cannot update user"
+
+            logger.error(msg, extra={"table": cls.model.__tablename__}, exc_info=True)
+            return None
+
+    @classmethod
+    async def find_cached(
+        cls, name: str, session: Optional[AsyncSession] = None
+    ) -> Optional[SUser]:
+        """
+        Пользователь без хэша пароля: сначала из памяти процесса,
+        затем из Redis (если USER_CACHE_REDIS), затем из БД.
+        """
+        user = user_cache.get(name)
+        if user is not None:
+            return user
+
+        redis = get_redis() if settings.USER_CACHE_REDIS else None
+        if redis is not None:
+            try:
+                cached = await redis.get(redis_key("user", name))
+                if cached is not None:
+                    user = SUser.model_validate_json(cached)
+            except Exception:
+                logger.warning("Cannot get cached user", exc_info=True)
+
+        if user is None:
+            row = await cls.find_one_or_none(session=session, name=name)
+            if row is None:
+                return None
+            user = SUser.model_validate(dict(row))
+            if redis is not None:
+                try:
+                    await redis.set(
+                        redis_key("user", name),
+                        user.model_dump_json(),
+                        ex=settings.USER_CACHE_TTL,
+                    )
+                except Exception:
+                    logger.warning("Cannot cache user", exc_info=True)
+
+        user_cache.set(name, user)
+        return user
+
+    @classmethod
+    async def invalidate_cached(cls, name: str):
+        redis = get_redis() if settings.USER_CACHE_REDIS else None
+        if redis is not None:
+            try:
+                await redis.delete(redis_key("user", name))
+            except Exception:
+                logger.warning("Cannot invalidate cached user", exc_info=True)
+        # После Redis: воркеры не должны перечитать старую копию оттуда
+        await publish_invalidation([name], cache=USERS_CACHE)
@@ -1,31 +1,164 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Annotated, Literal, Optional, List
 
-from fastapi import APIRouter, Depends, FastAPI, Query
-from fastapi_cache.decorator import cache
+from fastapi import APIRouter, Body, Depends, FastAPI, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.auth.dependencies import get_current_user
 from app.api.dao.articledao import ArticleDAO
+from app.api.dao.pagination import decode_cursor, make_page
 from app.api.exceptions.exceptions import (
     ArticleNotExistsException,
+    CannotAddDataToDatabase,
+    DuplicateArticleIdsException,
+    IncorrectCursorException,
     IncorrectDateFormatException,
     NoPermissionToDeleteException,
     NoPermissionToEditException,
 )
-from app.api.models.schemas import SArticle, SArticleCreateEdit
+from app.api.models.schemas import (
+    SArticle,
+    SArticleBulkEdit,
+    SArticleCreateEdit,
+    SArticlePage,
+    SArticleSearchResult,
+    SArticleSummary,
+    SArticleSummaryPage,
+    SBulkItemResult,
+)
 from app.api.models.user import User
+from app.api.responses import conditional, trusted_response
+from app.cache.decorator import cache
+from app.cache.versions import ARTICLES_COLLECTION
+from app.core.serialization import dumps
+from app.db.base import get_session
+from app.cache.tags import (
+    ARTICLES_ALL_TAG,
+    ARTICLES_HEAD_TAG,
+    ARTICLES_PAGES_TAG,
+    ARTICLES_SEARCH_TAG,
+    article_tag,
+    author_tag,
+    date_tag,
+)
 
 app = FastAPI()
 
 router = APIRouter(prefix="/articles", tags=["Статьи"])
 
+# Размер страниц выборок по автору и дате
+DEFAULT_PER_PAGE = 10
+MAX_PER_PAGE = 50
+# Максимум статей в одном пакетном запросе
+MAX_BULK_ITEMS = 500
+# Краткие списки без текста легкие, поэтому страницы у них больше
+DEFAULT_SUMMARY_PER_PAGE = 20
+MAX_SUMMARY_PER_PAGE = 100
+MAX_EXCERPT_LENGTH = 500
+
+
+# Теги ключей кэша: по ним ArticleDAO удаляет только затронутые записью ключи
+def all_articles_tags(result, kwargs):
+    return {ARTICLES_ALL_TAG}
+
+
+def page_tags(result, kwargs):
+    return {ARTICLES_PAGES_TAG, *(article_tag(article["id"]) for article in result)}
+
+
+def cursor_page_tags(result, kwargs):
+    items = result["items"]
+    tags = {article_tag(article["id"]) for article in items}
+    tags |= {date_tag(article["publication_date"]) for article in items}
+    if not kwargs.get("cursor"):
+        tags.add(ARTICLES_HEAD_TAG)
+    return tags
+
+
+def author_tags(result, kwargs):
+    return {author_tag(kwargs["author_name"])}
+
+
+def date_tags(result, kwargs):
+    # Дата из URL может быть без ведущих нулей, а DAO помечает ключи ISO-датой
+    publication_date = datetime.strptime(kwargs["publication_date"], "%Y-%m-%d")
+    return {date_tag(publication_date)}
+
+
+def article_id_tags(result, kwargs):
+    return {article_tag(kwargs["article_id"])}
+
+
+def search_tags(result, kwargs):
+    return {ARTICLES_SEARCH_TAG}
+
+
+def filtered_articles_tags(result, kwargs):
+    if kwargs.get("author_name"):
+        return author_tags(result, kwargs)
+    if kwargs.get("publication_date"):
+        return date_tags(result, kwargs)
+    if kwargs.get("page") is not None and kwargs.get("per_page") is not None:
+        return page_tags(result, kwargs)
+    return all_articles_tags(result, kwargs)
+
+
+def parse_cursor(cursor: Optional[str]):
+    try:
+        return decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise IncorrectCursorException
+
+
+def check_unique_ids(article_ids: list[int]) -> None:
+    # Статусы пакетных операций возвращаются по одному на id, и ответ
+    # должен совпадать с запросом поэлементно
+    if len(set(article_ids)) != len(article_ids):
+        raise DuplicateArticleIdsException
+
+
+def page_response(page: dict) -> Response:
+    headers = {"X-Total-Count": str(page["total"])}
+    if page["next_cursor"]:
+        headers["X-Next-Cursor"] = page["next_cursor"]
+    return Response(
+        dumps(page["items"]), media_type="application/json", headers=headers
+    )
+
+
+@cache(expire=300, tags=author_tags)
+async def get_author_page(author_name: str, per_page: int, cursor: Optional[str]):
+    articles = await ArticleDAO.find_by_author(
+        author_name, limit=per_page + 1, after=parse_cursor(cursor)
+    )
+    page = make_page(articles, per_page)
+    page["total"] = await ArticleDAO.count(author=author_name)
+    return page
+
+
+@cache(expire=300, tags=date_tags)
+async def get_date_page(publication_date: str, per_page: int, cursor: Optional[str]):
+    try:
+        parsed_date = datetime.strptime(publication_date, "%Y-%m-%d").date()
+    except ValueError:
+        raise IncorrectDateFormatException
+    articles = await ArticleDAO.find_by_date(
+        parsed_date, limit=per_page + 1, after=parse_cursor(cursor)
+    )
+    page = make_page(articles, per_page)
+    page["total"] = await ArticleDAO.count(publication_date=parsed_date)
+    return page
+
 
 # Объединение всех методов в один
 @router.get("/articles", response_model=List[SArticle])
-@cache(expire=30)
+@conditional(ARTICLES_COLLECTION)
+@trusted_response
+@cache(expire=300, tags=filtered_articles_tags)
 async def get_articles(
     page: Optional[int] = Query(None, ge=1),
-    per_page: Optional[int] = Query(None, le=10),
+    per_page: Optional[int] = Query(None, ge=1, le=10),
     author_name: Optional[str] = None,
     publication_date: Optional[str] = None
 ):
@@ -37,16 +170,19 @@ async def get_articles(
         author_name: Имя автора для фильтрации.
         publication_date: Дата публикации в формате YYYY-MM-DD для фильтрации.
     Returns:\n
-        Список статей, отфильтрованных по указанным параметрам.
+        Список статей, отфильтрованных по указанным параметрам. По автору и
+        дате - только первые per_page (без него - 50) статей от новых
+        к старым, остальные страницы отдают /sort_by_author и /sort_by_date.
     Raises:\n
         403: Некорректный формат даты.
     """
+    limit = per_page or MAX_PER_PAGE
     if author_name:
-        return await ArticleDAO.find_by_author(author_name)
+        return await ArticleDAO.find_by_author(author_name, limit=limit)
     elif publication_date:
         try:
             publication_date = datetime.strptime(publication_date, "%Y-%m-%d")
-            return await ArticleDAO.find_by_date(publication_date)
+            return await ArticleDAO.find_by_date(publication_date, limit=limit)
         except ValueError:
             raise IncorrectDateFormatException
     elif page is not None and per_page is not None:
@@ -57,9 +193,11 @@ async def get_articles(
 
 
 # Получение всех статей
-@router.get("/all")
-@cache(expire=60)
-async def get_all_articles() -> list[SArticle]:
+@router.get("/all", response_model=list[SArticle])
+@conditional(ARTICLES_COLLECTION)
+@trusted_response
+@cache(expire=600, tags=all_articles_tags)
+async def get_all_articles():
     """
     Получает все статьи.\n
     Returns:\n
@@ -68,11 +206,46 @@ async def get_all_articles() -> list[SArticle]:
     return await ArticleDAO.find_all()
 
 
+async def export_ndjson():
+    async for batch in ArticleDAO.stream_all():
+        yield b"".join(dumps(row) + b"\n" for row in batch)
+
+
+async def export_json_array():
+    yield b"["
+    first = True
+    async for batch in ArticleDAO.stream_all():
+        chunk = b",".join(dumps(row) for row in batch)
+        yield chunk if first else b"," + chunk
+        first = False
+    yield b"]"
+
+
+# Потоковая выгрузка всех статей
+@router.get("/export")
+@conditional(ARTICLES_COLLECTION)
+async def export_articles(
+        format: Literal["ndjson", "json"] = "ndjson",
+) -> StreamingResponse:
+    """
+    Выгружает все статьи потоком, пачками из БД, без загрузки в память.\n
+    Args:\n
+        :param format: ndjson - статья на строку, json - JSON-массив
+    Returns:\n
+        :return: Поток статей в выбранном формате
+    """
+    if format == "ndjson":
+        return StreamingResponse(export_ndjson(), media_type="application/x-ndjson")
+    return StreamingResponse(export_json_array(), media_type="application/json")
+
+
 # Получение всех статей c пагинацией
 @router.get("/page", response_model=list[SArticle])
-@cache(expire=30)
+@conditional(ARTICLES_COLLECTION)
+@trusted_response
+@cache(expire=300, tags=page_tags)
 async def get_articles_with_pagination(
-        page: int = Query(1, ge=1), per_page: int = Query(5, le=10)
+        page: int = Query(1, ge=1), per_page: int = Query(5, ge=1, le=10)
 ):
     """
     Получает список статей с пагинацией.\n
@@ -87,44 +260,281 @@ async def get_articles_with_pagination(
     return articles
 
 
-# Получение всех статей по автору
-@router.get("/sort_by_author/{author_name}")
-@cache(expire=30)
-async def get_articles_by_author(author_name: str) -> list[SArticle]:
+# Получение статей c пагинацией по курсору
+@router.get("/cursor_page", response_model=SArticlePage)
+@conditional(ARTICLES_COLLECTION)
+@trusted_response
+@cache(expire=300, tags=cursor_page_tags)
+async def get_articles_by_cursor(
+        cursor: Optional[str] = None, per_page: int = Query(5, ge=1, le=10)
+):
+    """
+    Получает страницу статей, упорядоченных от новых к старым, по курсору.\n
+    Args:\n
+        :param cursor: Курсор из поля next_cursor предыдущей страницы
+        :param per_page: Количество статей на странице (максимум 10)
+    Returns:\n
+        :return: Статьи страницы и курсор следующей страницы (null на последней)
+    Raises:\n
+        :raises 400: Некорректный курсор.
+    """
+    # Запрашиваем на одну статью больше, чтобы узнать, есть ли следующая страница
+    articles = await ArticleDAO.get_articles_by_cursor(
+        limit=per_page + 1, after=parse_cursor(cursor)
+    )
+    return make_page(articles, per_page)
+
+
+# Полнотекстовый поиск статей
+@router.get("/search", response_model=list[SArticleSearchResult])
+@conditional(ARTICLES_COLLECTION)
+@trusted_response
+@cache(expire=60, tags=search_tags)
+async def search_articles(
+        q: str = Query(..., min_length=1, max_length=200),
+        page: int = Query(1, ge=1),
+        per_page: int = Query(DEFAULT_PER_PAGE, ge=1, le=MAX_PER_PAGE),
+):
+    """
+    Ищет статьи по заголовку и тексту.\n
+    Args:\n
+        :param q: Поисковый запрос, поддерживает "фразы в кавычках", OR и -исключение
+        :param page: Номер страницы
+        :param per_page: Количество статей на странице (максимум 50)
+    Returns:\n
+        :return: Статьи по убыванию релевантности с фрагментами текста,
+        в которых найденные слова выделены тегом <b>. Остальной HTML
+        во фрагменте экранирован
+    """
+    offset = (page - 1) * per_page
+    return await ArticleDAO.search(q, offset=offset, limit=per_page)
+
+
+# Получение статей по автору
+@router.get("/sort_by_author/{author_name}", response_model=list[SArticle])
+@conditional(ARTICLES_COLLECTION)
+async def get_articles_by_author(
+        author_name: str,
+        cursor: Optional[str] = None,
+        per_page: int = Query(DEFAULT_PER_PAGE, ge=1, le=MAX_PER_PAGE),
+):
     """
-    Получает статьи по имени автора.\n
+    Получает статьи по имени автора, от новых к старым, постранично.\n
     Args:\n
         author_name: Имя автора
+        cursor: Курсор из заголовка X-Next-Cursor предыдущей страницы
+        per_page: Количество статей на странице (максимум 50)
     Returns:\n
-        :return: Список статей, написанных указанным автором
+        :return: Список статей, написанных указанным автором. Заголовок
+        X-Total-Count содержит общее число статей автора, X-Next-Cursor -
+        курсор следующей страницы (отсутствует на последней).
+    Raises:\n
+        :raises 400: Некорректный курсор.
     """
-    return await ArticleDAO.find_by_author(author_name)
+    page = await get_author_page(
+        author_name=author_name, per_page=per_page, cursor=cursor
+    )
+    return page_response(page)
 
 
-# Получение всех статей по дате
-@router.get("/sort_by_date/{publication_date}")
-@cache(expire=30)
-async def get_articles_by_date(publication_date: str) -> list[SArticle]:
+# Получение статей по дате
+@router.get("/sort_by_date/{publication_date}", response_model=list[SArticle])
+@conditional(ARTICLES_COLLECTION)
+async def get_articles_by_date(
+        publication_date: str,
+        cursor: Optional[str] = None,
+        per_page: int = Query(DEFAULT_PER_PAGE, ge=1, le=MAX_PER_PAGE),
+):
     """
-    Получает статьи по дате публикации.\n
+    Получает статьи по дате публикации постранично.\n
     Args:\n
         publish_date: Дата публикации в формате YYYY-MM-DD
+        cursor: Курсор из заголовка X-Next-Cursor предыдущей страницы
+        per_page: Количество статей на странице (максимум 50)
     Returns:\n
-        :return: Список статей, опубликованных в указанную дату
+        :return: Список статей, опубликованных в указанную дату. Заголовки
+        X-Total-Count и X-Next-Cursor как у выборки по автору.
     Raises: \n
+        :raises 400: Некорректный курсор.
+        :raises 403: Некорректный формат даты.
+    """
+    page = await get_date_page(
+        publication_date=publication_date, per_page=per_page, cursor=cursor
+    )
+    return page_response(page)
+
+
+# Статья целиком по id, например после выбора в кратком списке
+@router.get("/id/{article_id}", response_model=SArticle)
+@conditional(ARTICLES_COLLECTION)
+@trusted_response
+@cache(expire=600, tags=article_id_tags)
+async def get_article(article_id: int):
+    """
+    Получает статью с текстом по идентификатору.\n
+    Args:\n
+        :param article_id: Идентификатор статьи
+    Returns:\n
+        :return: Статья
+    Raises:\n
+        :raises 404: Если статья не найдена.
+    """
+    article = await ArticleDAO.find_one_or_none(id=article_id)
+    if article is None:
+        raise ArticleNotExistsException
+    return article
+
+
+# Краткие списки статей: id, заголовок, дата, автор и отрывок по запросу.
+# Текст статей не читается из БД и не попадает в кэш.
+@router.get("/summary/all", response_model=list[SArticleSummary])
+@conditional(ARTICLES_COLLECTION)
+@trusted_response
+@cache(expire=600, tags=all_articles_tags)
+async def get_all_summaries(excerpt: int = Query(0, ge=0, le=MAX_EXCERPT_LENGTH)):
+    """
+    Получает краткий список всех статей.\n
+    Args:\n
+        :param excerpt: Длина отрывка текста в символах (0 - без отрывка)
+    Returns:\n
+        :return: Список статей без текста
+    """
+    return await ArticleDAO.find_summaries(excerpt_length=excerpt)
+
+
+@router.get("/summary/page", response_model=list[SArticleSummary])
+@conditional(ARTICLES_COLLECTION)
+@trusted_response
+@cache(expire=300, tags=page_tags)
+async def get_summaries_with_pagination(
+        page: int = Query(1, ge=1),
+        per_page: int = Query(
+            DEFAULT_SUMMARY_PER_PAGE, ge=1, le=MAX_SUMMARY_PER_PAGE
+        ),
+        excerpt: int = Query(0, ge=0, le=MAX_EXCERPT_LENGTH),
+):
+    """
+    Получает краткий список статей с пагинацией.\n
+    Args:\n
+        :param page: Номер страницы
+        :param per_page: Количество статей на странице (максимум 100)
+        :param excerpt: Длина отрывка текста в символах (0 - без отрывка)
+    Returns:\n
+        :return: Список статей без текста
+    """
+    offset = (page - 1) * per_page
+    return await ArticleDAO.get_summaries_paginated(
+        offset=offset, limit=per_page, excerpt_length=excerpt
+    )
+
+
+@router.get("/summary/cursor_page", response_model=SArticleSummaryPage)
+@conditional(ARTICLES_COLLECTION)
+@trusted_response
+@cache(expire=300, tags=cursor_page_tags)
+async def get_summaries_by_cursor(
+        cursor: Optional[str] = None,
+        per_page: int = Query(
+            DEFAULT_SUMMARY_PER_PAGE, ge=1, le=MAX_SUMMARY_PER_PAGE
+        ),
+        excerpt: int = Query(0, ge=0, le=MAX_EXCERPT_LENGTH),
+):
+    """
+    Получает страницу краткого списка статей от новых к старым по курсору.\n
+    Args:\n
+        :param cursor: Курсор из поля next_cursor предыдущей страницы
+        :param per_page: Количество статей на странице (максимум 100)
+        :param excerpt: Длина отрывка текста в символах (0 - без отрывка)
+    Returns:\n
+        :return: Статьи страницы без текста и курсор следующей страницы
+    Raises:\n
+        :raises 400: Некорректный курсор.
+    """
+    articles = await ArticleDAO.get_summaries_by_cursor(
+        limit=per_page + 1, after=parse_cursor(cursor), excerpt_length=excerpt
+    )
+    return make_page(articles, per_page)
+
+
+@router.get("/summary/by_author/{author_name}", response_model=SArticleSummaryPage)
+@conditional(ARTICLES_COLLECTION)
+@trusted_response
+@cache(expire=300, tags=author_tags)
+async def get_summaries_by_author(
+        author_name: str,
+        cursor: Optional[str] = None,
+        per_page: int = Query(
+            DEFAULT_SUMMARY_PER_PAGE, ge=1, le=MAX_SUMMARY_PER_PAGE
+        ),
+        excerpt: int = Query(0, ge=0, le=MAX_EXCERPT_LENGTH),
+):
+    """
+    Получает краткий список статей автора от новых к старым по курсору.\n
+    Args:\n
+        :param author_name: Имя автора
+        :param cursor: Курсор из поля next_cursor предыдущей страницы
+        :param per_page: Количество статей на странице (максимум 100)
+        :param excerpt: Длина отрывка текста в символах (0 - без отрывка)
+    Returns:\n
+        :return: Статьи страницы без текста и курсор следующей страницы
+    Raises:\n
+        :raises 400: Некорректный курсор.
+    """
+    articles = await ArticleDAO.get_summaries_by_cursor(
+        limit=per_page + 1,
+        after=parse_cursor(cursor),
+        excerpt_length=excerpt,
+        author=author_name,
+    )
+    return make_page(articles, per_page)
+
+
+@router.get(
+    "/summary/by_date/{publication_date}", response_model=SArticleSummaryPage
+)
+@conditional(ARTICLES_COLLECTION)
+@trusted_response
+@cache(expire=300, tags=date_tags)
+async def get_summaries_by_date(
+        publication_date: str,
+        cursor: Optional[str] = None,
+        per_page: int = Query(
+            DEFAULT_SUMMARY_PER_PAGE, ge=1, le=MAX_SUMMARY_PER_PAGE
+        ),
+        excerpt: int = Query(0, ge=0, le=MAX_EXCERPT_LENGTH),
+):
+    """
+    Получает краткий список статей за дату по курсору.\n
+    Args:\n
+        :param publication_date: Дата публикации в формате YYYY-MM-DD
+        :param cursor: Курсор из поля next_cursor предыдущей страницы
+        :param per_page: Количество статей на странице (максимум 100)
+        :param excerpt: Длина отрывка текста в символах (0 - без отрывка)
+    Returns:\n
+        :return: Статьи страницы без текста и курсор следующей страницы
+    Raises:\n
+        :raises 400: Некорректный курсор.
         :raises 403: Некорректный формат даты.
     """
     try:
-        publication_date = datetime.strptime(publication_date, "%Y-%m-%d")
-        return await ArticleDAO.find_by_date(publication_date)
-    except:
+        parsed_date = datetime.strptime(publication_date, "%Y-%m-%d").date()
+    except ValueError:
         raise IncorrectDateFormatException
+    articles = await ArticleDAO.get_summaries_by_cursor(
+        limit=per_page + 1,
+        after=parse_cursor(cursor),
+        excerpt_length=excerpt,
+        publication_date=parsed_date,
+    )
+    return make_page(articles, per_page)
 
 
 # Создание статьи
 @router.post("/create", status_code=201)
 async def create_article(
-        article_data: SArticleCreateEdit, author: User = Depends(get_current_user)
+        article_data: SArticleCreateEdit,
+        author: User = Depends(get_current_user),
+        session: AsyncSession = Depends(get_session),
 ) -> SArticle:
     """
     Создает статью.\n
@@ -142,6 +552,7 @@ async def create_article(
         contents=article_data.contents,
         publication_date=current_date,
         author=author.name,
+        session=session,
     )
     return new_article
 
@@ -152,6 +563,7 @@ async def edit_article(
         article_id: int,
         article_data: SArticleCreateEdit,
         current_user: User = Depends(get_current_user),
+        session: AsyncSession = Depends(get_session),
 ) -> str:
     """
     Редактирует статью по её идентификатору.\n
@@ -166,20 +578,18 @@ async def edit_article(
         :raises 403: Если нет прав для редактирования статьи.
         :raises 401: Если пользователь не авторизован.
     """
-    existing_article = await ArticleDAO.find_one_or_none(id=article_id)
-    if existing_article:
-        if (
-                current_user.name == existing_article["author"]
-                or current_user.role == "admin"
-        ):
-            await ArticleDAO.update_article(
-                article_id=article_id, article_data=article_data.dict()
-            )
-            return "Success edited"
-        else:
-            raise NoPermissionToEditException
-    else:
+    status = await ArticleDAO.update_article_checked(
+        article_id=article_id,
+        article_data=article_data.dict(),
+        user_name=current_user.name,
+        is_admin=current_user.role == "admin",
+        session=session,
+    )
+    if status == "not_found":
         raise ArticleNotExistsException
+    if status == "forbidden":
+        raise NoPermissionToEditException
+    return "Success edited"
 
 
 # Удаление статьи по id
@@ -187,6 +597,7 @@ async def edit_article(
 async def remove_article(
         article_id: int,
         current_user: User = Depends(get_current_user),
+        session: AsyncSession = Depends(get_session),
 ) -> str:
     """
     Удаляет статью по её идентификатору.\n
@@ -199,12 +610,117 @@ async def remove_article(
         :raises 404: Если статья не найдена.
         :raises 403: Если нет прав для удаления статьи.
     """
-    existing_id = await ArticleDAO.find_one_or_none(id=article_id)
-    if existing_id:
-        if current_user.name == existing_id["author"] or current_user.role == "admin":
-            await ArticleDAO.delete(id=article_id)
-            return "Success deleted"
-        else:
-            raise NoPermissionToDeleteException
-    else:
+    status = await ArticleDAO.delete_article_checked(
+        article_id=article_id,
+        user_name=current_user.name,
+        is_admin=current_user.role == "admin",
+        session=session,
+    )
+    if status == "not_found":
         raise ArticleNotExistsException
+    if status == "forbidden":
+        raise NoPermissionToDeleteException
+    return "Success deleted"
+
+
+# Пакетное создание статей
+@router.post("/bulk/create", status_code=201)
+async def create_articles(
+        articles_data: Annotated[
+            list[SArticleCreateEdit], Body(min_length=1, max_length=MAX_BULK_ITEMS)
+        ],
+        author: User = Depends(get_current_user),
+        session: AsyncSession = Depends(get_session),
+) -> list[SArticle]:
+    """
+    Создает несколько статей одним запросом к БД.\n
+    Args: \n
+        :param articles_data: Список статей (максимум 500)
+        :param author: Текущий пользователь
+    Returns: \n
+        :return: Созданные статьи в порядке запроса
+    Raises: \n
+        :raises 401: Если пользователь не авторизован.
+        :raises 500: Если статьи не удалось сохранить.
+    """
+    current_date = datetime.now().date()
+    new_articles = await ArticleDAO.add_articles(
+        [
+            {
+                "title": article_data.title,
+                "contents": article_data.contents,
+                "publication_date": current_date,
+                "author": author.name,
+            }
+            for article_data in articles_data
+        ],
+        session=session,
+    )
+    if new_articles is None:
+        raise CannotAddDataToDatabase
+    return new_articles
+
+
+# Пакетное редактирование статей
+@router.put("/bulk/edit")
+async def edit_articles(
+        articles_data: Annotated[
+            list[SArticleBulkEdit], Body(min_length=1, max_length=MAX_BULK_ITEMS)
+        ],
+        current_user: User = Depends(get_current_user),
+        session: AsyncSession = Depends(get_session),
+) -> list[SBulkItemResult]:
+    """
+    Редактирует несколько статей в одной транзакции.\n
+    Args:\n
+        :param articles_data: Список статей с id (максимум 500)
+        :param current_user: Текущий пользователь
+    Returns:\n
+        :return: Статус по каждой статье: updated, not_found или forbidden.
+        Статьи без прав или не найденные пропускаются, остальные сохраняются.
+    Raises:\n
+        :raises 401: Если пользователь не авторизован.
+        :raises 422: Если id статей повторяются.
+    """
+    check_unique_ids([article_data.id for article_data in articles_data])
+    statuses = await ArticleDAO.update_articles(
+        [article_data.model_dump() for article_data in articles_data],
+        user_name=current_user.name,
+        is_admin=current_user.role == "admin",
+        session=session,
+    )
+    return [
+        {"id": article_id, "status": status} for article_id, status in statuses.items()
+    ]
+
+
+# Пакетное удаление статей
+@router.post("/bulk/delete")
+async def remove_articles(
+        article_ids: Annotated[
+            list[int], Body(min_length=1, max_length=MAX_BULK_ITEMS)
+        ],
+        current_user: User = Depends(get_current_user),
+        session: AsyncSession = Depends(get_session),
+) -> list[SBulkItemResult]:
+    """
+    Удаляет несколько статей одним запросом к БД.\n
+    Args: \n
+        :param article_ids: Список идентификаторов (максимум 500)
+        :param current_user: Текущий пользователь
+    Returns: \n
+        :return: Статус по каждой статье: deleted, not_found или forbidden.
+    Raises: \n
+        :raises 401: Если пользователь не авторизован.
+        :raises 422: Если id статей повторяются.
+    """
+    check_unique_ids(article_ids)
+    statuses = await ArticleDAO.delete_articles(
+        article_ids,
+        user_name=current_user.name,
+        is_admin=current_user.role == "admin",
+        session=session,
+    )
+    return [
+        {"id": article_id, "status": status} for article_id, status in statuses.items()
+    ]
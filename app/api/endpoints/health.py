@@ -0,0 +1,26 @@
+import os
+
+from fastapi import APIRouter
+from sqlalchemy import text
+
+from app.cache.l1 import l1_cache
+from app.db.base import async_session_maker, get_pool_stats
+
+router = APIRouter(prefix="", tags=["Служебные"])
+
+
+@router.get("/health")
+async def healthcheck() -> dict:
+    """
+    Проверяет доступность БД и возвращает состояние пула соединений.\n
+    Returns:\n
+        :return: Статус сервиса, pid процесса, статистика пула и кэша в памяти
+    """
+    async with async_session_maker() as session:
+        await session.execute(text("SELECT 1"))
+    return {
+        "status": "ok",
+        "pid": os.getpid(),
+        "pool": get_pool_stats(),
+        "cache": l1_cache.stats(),
+    }
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Response
+
+from app.core.metrics import render
+
+router = APIRouter(prefix="", tags=["Служебные"])
+
+
+@router.get("/metrics")
+async def metrics() -> Response:
+    """
+    Метрики всех воркеров в текстовом формате Prometheus.\n
+    Returns:\n
+        :return: Гистограммы времени запросов, запросы к БД, кэш и пул
+    """
+    content, media_type = render()
+    return Response(content, headers={"Content-Type": media_type})
@@ -1,12 +1,33 @@
-from fastapi import APIRouter, Response
+from typing import Optional
 
-from app.api.auth.auth import authenticate_user, create_access_token, get_password_hash
+from fastapi import APIRouter, Depends, Request, Response
+
+from app.api.auth.auth import (
+    authenticate_user,
+    create_access_token,
+    get_password_hash_async,
+)
+from app.api.auth.dependencies import get_current_user
+from app.api.auth.sessions import (
+    REFRESH_COOKIE,
+    create_session,
+    list_sessions,
+    refresh_token_expire,
+    revoke_all_sessions,
+    revoke_by_token,
+    revoke_session,
+    rotate_session,
+)
 from app.api.dao.userdao import UserDAO
 from app.api.exceptions.exceptions import (
     CannotAddDataToDatabase,
+    SessionNotFoundException,
+    TokenAbsentException,
     UserAlreadyExistsException,
+    UserIsNotPresentException,
 )
-from app.api.models.schemas import SUserLogin, SUserRegister
+from app.api.models.schemas import SSession, SUserLogin, SUserRegister
+from app.api.models.user import User
 
 router = APIRouter(prefix="", tags=["Пользователи"])
 
@@ -21,13 +42,14 @@ async def register_user(user_data: SUserRegister) -> str:
     Raises:\n
         :raises 409: Если пользователь уже существует
         :raises 422: Если данные невалидны
+        :raises 503: Если очередь хэширования паролей переполнена
     Returns:\n
         :return: Сообщение об успешной регистрации
     """
     existing_user = await UserDAO.find_one_or_none(name=user_data.name)
     if existing_user:
         raise UserAlreadyExistsException
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     new_user = await UserDAO.add_user(
         name=user_data.name,
         email=user_data.email,
@@ -39,10 +61,26 @@ async def register_user(user_data: SUserRegister) -> str:
     return "Success registrations"
 
 
+def set_auth_cookies(
+    response: Response, user_name: str, refresh_token: Optional[str]
+) -> None:
+    access_token = create_access_token({"sub": user_name})
+    response.set_cookie("my_journal_access_token", access_token, httponly=True)
+    if refresh_token:
+        response.set_cookie(
+            REFRESH_COOKIE,
+            refresh_token,
+            max_age=refresh_token_expire(),
+            httponly=True,
+        )
+
+
 @router.post("/login")
-async def login_user(response: Response, user_data: SUserLogin) -> str:
+async def login_user(
+    request: Request, response: Response, user_data: SUserLogin
+) -> str:
     """
-    Аутентифицирует пользователя и выдает токен доступа.\n
+    Аутентифицирует пользователя и выдает токены доступа и обновления.\n
 
     Args:\n
         :param response: Объект ответа
@@ -51,17 +89,98 @@ async def login_user(response: Response, user_data: SUserLogin) -> str:
         :return: Сообщение об успешной авторизации
     """
     user = await authenticate_user(user_data.name, user_data.password)
-    access_token = create_access_token({"sub": str(user.name)})
-    response.set_cookie("my_journal_access_token", access_token, httponly=True)
+    refresh_token = await create_session(
+        str(user.name), request.headers.get("user-agent", "")
+    )
+    set_auth_cookies(response, str(user.name), refresh_token)
     return "Success login"
 
 
+@router.post("/refresh")
+async def refresh_tokens(request: Request, response: Response) -> str:
+    """
+    Выдает новый токен доступа по токену обновления без пароля.
+    Токен обновления при этом заменяется новым.\n
+
+    Args:\n
+        :param response: Объект ответа
+    Returns:\n
+        :return: Сообщение об успешном обновлении
+    Raises:\n
+        :raises 401: Токена нет, сессия истекла, отозвана или токен уже
+        был использован (тогда сессия отзывается), пользователя больше нет.
+    """
+    token = request.cookies.get(REFRESH_COOKIE)
+    if not token:
+        raise TokenAbsentException
+    user_name, refresh_token = await rotate_session(
+        token, request.headers.get("user-agent", "")
+    )
+    if await UserDAO.find_cached(user_name) is None:
+        # Пользователь удален после входа: его сессия больше не действует
+        await revoke_by_token(refresh_token)
+        raise UserIsNotPresentException
+    set_auth_cookies(response, user_name, refresh_token)
+    return "Success refresh"
+
+
 @router.post("/logout")
-async def logout_user(response: Response):
+async def logout_user(request: Request, response: Response):
     """
-    Выход пользователя из системы. \n
+    Выход пользователя из системы, сессия отзывается. \n
 
     Args:\n
         :param response: Объект ответа
     """
+    token = request.cookies.get(REFRESH_COOKIE)
+    if token:
+        await revoke_by_token(token)
     response.delete_cookie("my_journal_access_token")
+    response.delete_cookie(REFRESH_COOKIE)
+
+
+@router.get("/sessions", response_model=list[SSession])
+async def get_sessions(request: Request, user: User = Depends(get_current_user)):
+    """
+    Активные сессии текущего пользователя.\n
+
+    Returns:\n
+        :return: Сессии с временем входа, последнего обновления и браузером,
+        current - сессия этого запроса
+    Raises:\n
+        :raises 401: Если пользователь не авторизован.
+    """
+    return await list_sessions(user.name, request.cookies.get(REFRESH_COOKIE))
+
+
+@router.delete("/sessions/{session_id}")
+async def delete_session(session_id: str, user: User = Depends(get_current_user)):
+    """
+    Отзывает сессию текущего пользователя, например на потерянном устройстве.\n
+
+    Args:\n
+        :param session_id: Идентификатор сессии из /sessions
+    Raises:\n
+        :raises 401: Если пользователь не авторизован.
+        :raises 404: Если у пользователя нет такой сессии.
+        :raises 503: Если хранилище сессий недоступно.
+    """
+    if not await revoke_session(user.name, session_id):
+        raise SessionNotFoundException
+    return "Success"
+
+
+@router.delete("/sessions")
+async def delete_all_sessions(
+    response: Response, user: User = Depends(get_current_user)
+):
+    """
+    Отзывает все сессии текущего пользователя, включая эту.\n
+
+    Raises:\n
+        :raises 401: Если пользователь не авторизован.
+        :raises 503: Если хранилище сессий недоступно.
+    """
+    await revoke_all_sessions(user.name)
+    response.delete_cookie(REFRESH_COOKIE)
+    return "Success"
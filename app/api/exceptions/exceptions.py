@@ -34,6 +34,16 @@ class IncorrectTokenFormatException(ArticleAndUserException):
     detail = "Неверный формат токена"
 
 
+class RefreshTokenInvalidException(ArticleAndUserException):
+    status_code = status.HTTP_401_UNAUTHORIZED
+    detail = "Сессия недействительна, войдите заново"
+
+
+class SessionNotFoundException(ArticleAndUserException):
+    status_code = status.HTTP_404_NOT_FOUND
+    detail = "Сессия не найдена"
+
+
 class UserIsNotPresentException(ArticleAndUserException):
     status_code = status.HTTP_401_UNAUTHORIZED
     detail = "Необходимо авторизоваться"
@@ -64,11 +74,39 @@ class IncorrectDateFormatException(ArticleAndUserException):
     detail = "Некорректный формат даты"
 
 
+class IncorrectCursorException(ArticleAndUserException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    detail = "Некорректный курсор пагинации"
+
+
+class DuplicateArticleIdsException(ArticleAndUserException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    detail = "Идентификаторы статей в запросе повторяются"
+
+
 class CannotAddDataToDatabase(ArticleAndUserException):
     status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
     detail = "Не удалось добавить запись"
 
 
+class ServiceOverloadedException(ArticleAndUserException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    detail = "Сервис перегружен, повторите запрос позже"
+
+    def __init__(self):
+        super().__init__()
+        self.headers = {"Retry-After": "1"}
+
+
+class SessionStoreUnavailableException(ArticleAndUserException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    detail = "Хранилище сессий недоступно, повторите запрос позже"
+
+    def __init__(self):
+        super().__init__()
+        self.headers = {"Retry-After": "1"}
+
+
 class UserNotFoundException(Exception):
     def __init__(self, message="User not found"):
         self.message = message
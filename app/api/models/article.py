@@ -1,15 +1,41 @@
-from sqlalchemy import Column, Date, ForeignKey, Integer, String
+from sqlalchemy import Column, Computed, Date, ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred
 
 from app.db.base import Base
 
+# Конфигурация полнотекстового поиска: статьи пишутся на русском
+SEARCH_CONFIG = "russian"
+
 
 class Article(Base):
     __tablename__ = "article"
+    __table_args__ = (
+        # Поиск по дате и keyset-пагинация по (publication_date, id)
+        Index("ix_article_publication_date_id", "publication_date", "id"),
+        # Постраничная выборка статей автора в том же порядке
+        Index(
+            "ix_article_author_publication_date_id", "author", "publication_date", "id"
+        ),
+        Index("ix_article_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
     id = Column(Integer, autoincrement=True, primary_key=True)
     title = Column(String, nullable=False)
     contents = Column(String, nullable=False)
     publication_date = Column(Date, nullable=False)
     author = Column(ForeignKey("user.name"), nullable=False)
+    # Вычисляется Postgres, в обычных выборках не загружается
+    search_vector = deferred(
+        Column(
+            TSVECTOR,
+            Computed(
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', title), 'A') || "
+                f"setweight(to_tsvector('{SEARCH_CONFIG}', contents), 'B')",
+                persisted=True,
+            ),
+        )
+    )
 
     def __str__(self):
         return f"Статья {self.title}"
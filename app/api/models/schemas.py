@@ -1,4 +1,5 @@
-from datetime import date
+from datetime import date, datetime
+from typing import Literal, Optional
 
 from pydantic import BaseModel, EmailStr
 
@@ -11,11 +12,53 @@ class SArticle(BaseModel):
     author: str
 
 
+class SArticlePage(BaseModel):
+    items: list[SArticle]
+    next_cursor: Optional[str] = None
+
+
+class SArticleSummary(BaseModel):
+    id: int
+    title: str
+    publication_date: date
+    author: str
+    excerpt: Optional[str] = None
+
+
+class SArticleSummaryPage(BaseModel):
+    items: list[SArticleSummary]
+    next_cursor: Optional[str] = None
+
+
+class SArticleSearchResult(BaseModel):
+    id: int
+    title: str
+    publication_date: date
+    author: str
+    rank: float
+    snippet: str
+
+
 class SArticleCreateEdit(BaseModel):
     title: str
     contents: str
 
 
+class SArticleBulkEdit(SArticleCreateEdit):
+    id: int
+
+
+class SBulkItemResult(BaseModel):
+    id: int
+    status: Literal["updated", "deleted", "not_found", "forbidden"]
+
+
+class SUser(BaseModel):
+    name: str
+    email: str
+    role: str
+
+
 class SUserRegister(BaseModel):
     name: str
     email: EmailStr
@@ -25,3 +68,11 @@ class SUserRegister(BaseModel):
 class SUserLogin(BaseModel):
     name: str
     password: str
+
+
+class SSession(BaseModel):
+    id: str
+    created: datetime
+    last_used: datetime
+    user_agent: str
+    current: bool
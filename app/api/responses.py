@@ -0,0 +1,152 @@
+import asyncio
+import inspect
+from functools import wraps
+from typing import Optional
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi_cache import FastAPICache
+
+from app.api.compression import choose_encoding, compress
+from app.cache.variants import Variant, get_variant, set_variant, variant_key
+from app.cache.versions import get_version, request_version
+from app.core.config import settings
+from app.core.serialization import dumps
+
+
+def trusted_response(func):
+    """
+    Для эндпоинтов, которые отдают строки из БД или кэша, уже подходящие
+    под response_model: ответ сериализуется orjson за один проход без
+    повторной валидации pydantic. response_model роута остается для OpenAPI.
+    """
+
+    @wraps(func)
+    async def inner(*args, **kwargs):
+        result = await func(*args, **kwargs)
+        return Response(dumps(result), media_type="application/json")
+
+    return inner
+
+
+def make_etag(collection: str, version: int, encoding: Optional[str] = None) -> str:
+    # Сильный ETag различает сжатые варианты одного ответа
+    suffix = f"-{encoding}" if encoding else ""
+    return f'"{collection}-{version}{suffix}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Сравнение для If-None-Match: слабое, W/ в начале тега не учитывается"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+def cache_control() -> str:
+    return (
+        f"public, max-age={settings.HTTP_CACHE_MAX_AGE}, "
+        f"stale-while-revalidate={settings.HTTP_CACHE_STALE_WHILE_REVALIDATE}"
+    )
+
+
+async def encode_variant(response: Response, encoding: str) -> Optional[Variant]:
+    """
+    Сжатый вариант готового ответа. Потоковые, неуспешные и короткие ответы
+    (меньше RESPONSE_COMPRESSION_MIN_SIZE) не сжимаются.
+    """
+    if (
+        isinstance(response, StreamingResponse)
+        or response.status_code != 200
+        or len(response.body) < settings.RESPONSE_COMPRESSION_MIN_SIZE
+    ):
+        return None
+    loop = asyncio.get_running_loop()
+    # Большие списки сжимаются десятки миллисекунд, не блокируем event loop
+    body = await loop.run_in_executor(None, compress, response.body, encoding)
+    headers = {
+        name: value
+        for name, value in response.headers.items()
+        if name not in ("content-length", "content-type")
+    }
+    return Variant(body=body, media_type=response.media_type, headers=headers)
+
+
+def conditional(collection: str):
+    """
+    ETag из версии коллекции (app.cache.versions) и ответ 304 на совпавший
+    If-None-Match: проверка стоит одного GET в Redis, эндпоинт, кэш и БД
+    не вызываются.
+
+    Если клиент принимает сжатие, сжатый вариант ответа хранится в кэше
+    для текущей версии, и повторный запрос отдает готовые байты без
+    вызова эндпоинта и без сжатия.
+
+    Декоратор ставится над trusted_response, эндпоинт должен возвращать
+    Response. Без Redis заголовки не добавляются и ответ не сжимается,
+    с выключенным FastAPICache сжатые варианты не хранятся и не отдаются.
+
+    Прочитанная версия передается кэшу эндпоинта (request_version), чтобы
+    он не отдал из памяти воркера значение, посчитанное до записи.
+    """
+
+    def wrapper(func):
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        async def inner(*args, request: Request, **kwargs):
+            # Версию читаем до тела: если запись пройдет между ними, ETag
+            # окажется старше тела, и следующий запрос просто получит 200
+            version = await get_version(collection)
+            if version is None:
+                return await func(*args, **kwargs)
+            encoding = choose_encoding(request.headers.get("accept-encoding"))
+            if not FastAPICache.get_enable():
+                encoding = None
+            headers = {
+                "ETag": make_etag(collection, version, encoding),
+                "Cache-Control": cache_control(),
+                "Vary": "Accept-Encoding",
+            }
+            if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+                return Response(status_code=304, headers=headers)
+
+            token = request_version.set((collection, version))
+            try:
+                if encoding is not None:
+                    key = variant_key(collection, version, encoding, str(request.url))
+                    variant = await get_variant(key)
+                    if variant is None:
+                        response = await func(*args, **kwargs)
+                        variant = await encode_variant(response, encoding)
+                        if variant is not None:
+                            await set_variant(key, variant)
+                    if variant is not None:
+                        return Response(
+                            variant.body,
+                            media_type=variant.media_type,
+                            headers={
+                                **variant.headers,
+                                **headers,
+                                "Content-Encoding": encoding,
+                            },
+                        )
+                else:
+                    response = await func(*args, **kwargs)
+            finally:
+                request_version.reset(token)
+            response.headers.update(headers)
+            return response
+
+        # FastAPI берет параметры из сигнатуры, request нужен только здесь
+        request_parameter = inspect.Parameter(
+            "request", inspect.Parameter.KEYWORD_ONLY, annotation=Request
+        )
+        inner.__signature__ = signature.replace(
+            parameters=[*signature.parameters.values(), request_parameter]
+        )
+        return inner
+
+    return wrapper
@@ -0,0 +1,23 @@
+from typing import Optional
+
+from fastapi_cache import FastAPICache
+from redis import asyncio as aioredis
+
+# Префикс всех ключей приложения в Redis
+CACHE_PREFIX = "cache"
+
+
+def get_redis() -> Optional[aioredis.Redis]:
+    """
+    Возвращает клиент Redis из бэкенда FastAPICache или None,
+    если кэш не инициализирован (скрипты, тесты без lifespan).
+    """
+    try:
+        backend = FastAPICache.get_backend()
+    except AssertionError:
+        return None
+    return getattr(backend, "redis", None)
+
+
+def redis_key(*parts) -> str:
+    return ":".join([FastAPICache.get_prefix(), *map(str, parts)])
@@ -0,0 +1,70 @@
+import zlib
+from typing import Any, Callable
+
+import orjson
+import zstandard
+from fastapi_cache.coder import Coder
+
+from app.core.config import settings
+
+# Первый байт значения в Redis - способ сжатия
+RAW, ZSTD, LZ4, ZLIB = b"\x00", b"\x01", b"\x02", b"\x03"
+
+
+def _serializers(name: str) -> tuple[Callable, Callable]:
+    if name == "msgpack":
+        import msgpack
+
+        return msgpack.packb, msgpack.unpackb
+    return orjson.dumps, orjson.loads
+
+
+def _compressors(name: str) -> tuple[bytes, Callable, Callable]:
+    if name == "zstd":
+        return ZSTD, zstandard.ZstdCompressor().compress, zstandard.decompress
+    if name == "lz4":
+        import lz4.frame
+
+        return LZ4, lz4.frame.compress, lz4.frame.decompress
+    return ZLIB, zlib.compress, zlib.decompress
+
+
+class CompactCoder(Coder):
+    """
+    Кодирует значения кэша в orjson или msgpack и сжимает их, если они
+    больше порога. Значения должны состоять из JSON-типов: декоратор кэша
+    приводит к ним результат эндпоинта до кодирования.
+    """
+
+    def __init__(self, serializer: str, compression: str, threshold: int):
+        self._dumps, self._loads = _serializers(serializer)
+        self._compression = compression
+        self._threshold = threshold
+        # Распаковываем и значения, сжатые до смены CACHE_COMPRESSION
+        self._decompress = {
+            RAW: bytes,
+            ZSTD: zstandard.decompress,
+            ZLIB: zlib.decompress,
+        }
+        if compression != "none":
+            header, compress, decompress = _compressors(compression)
+            self._header, self._compress = header, compress
+            self._decompress[header] = decompress
+
+    def encode(self, value: Any) -> bytes:
+        data = self._dumps(value)
+        if self._compression == "none" or len(data) < self._threshold:
+            return RAW + data
+        return self._header + self._compress(data)
+
+    def decode(self, value: bytes) -> Any:
+        header, data = value[:1], value[1:]
+        return self._loads(self._decompress[header](data))
+
+
+def get_cache_coder() -> CompactCoder:
+    return CompactCoder(
+        serializer=settings.CACHE_CODER,
+        compression=settings.CACHE_COMPRESSION,
+        threshold=settings.CACHE_COMPRESSION_THRESHOLD,
+    )
@@ -0,0 +1,291 @@
+import asyncio
+import hashlib
+import math
+import random
+import time
+from dataclasses import dataclass, replace
+from functools import wraps
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from fastapi_cache import FastAPICache
+
+from app.cache import store
+from app.cache.backend import get_redis
+from app.cache.l1 import l1_cache
+from app.cache.tags import article_tag, tag_cache_keys
+from app.cache.versions import get_version, request_version
+from app.core.config import settings
+from app.core.metrics import record_cache
+from app.core.serialization import to_jsonable
+from app.logger import logger
+
+TagsBuilder = Callable[[Any, dict], Iterable[str]]
+
+# Статьи живут в кэше не меньше самого долгого TTL списков, которые на них ссылаются
+ARTICLE_EXPIRE = 600
+
+# Как часто ждущий запрос проверяет, не положил ли другой воркер значение в кэш
+LOCK_POLL_INTERVAL = 0.05
+
+# Пересчеты, идущие в этом процессе: ключ кэша -> задача
+_inflight: dict[str, asyncio.Task] = {}
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    # Когда значение посчитано, сколько секунд считалось и сколько оно свежее
+    created: float
+    delta: float
+    expire: int
+    # Размер закодированного значения вместе со статьями, вес в l1_cache
+    size: int = 0
+    # Версия коллекции, при которой значение попало в память воркера
+    version: int = 0
+
+    def is_fresh(self, now: float, beta: float) -> bool:
+        """
+        Раннее вероятностное обновление (XFetch): чем ближе истечение TTL
+        и чем дольше считается значение, тем вероятнее, что запрос
+        обновит его заранее, не дожидаясь одновременного промаха у всех.
+        """
+        early = -self.delta * beta * math.log(1.0 - random.random())
+        return now + early < self.created + self.expire
+
+    def fresh_for(self, now: float) -> float:
+        return self.created + self.expire - now
+
+
+def build_cache_key(func: Callable, namespace: str, kwargs: dict) -> str:
+    params = ":".join(f"{name}={kwargs[name]}" for name in sorted(kwargs))
+    digest = hashlib.md5(params.encode()).hexdigest()  # nosec: B303
+    return f"{FastAPICache.get_prefix()}:{namespace}:{func.__name__}:{digest}"
+
+
+async def get_cached(redis, coder, cache_key: str) -> Optional[CacheEntry]:
+    """
+    Читает значение и статьи, на которые оно ссылается. Если хотя бы одной
+    статьи уже нет в кэше, значение считается отсутствующим.
+    """
+    cached = await redis.get(cache_key)
+    if cached is None:
+        return None
+    entry = coder.decode(cached)
+    value, size = entry["value"], len(cached)
+    ids = store.references(value)
+    if ids:
+        keys = [store.article_key(article_id) for article_id in ids]
+        bodies = await redis.mget(keys)
+        if any(body is None for body in bodies):
+            return None
+        value = store.unpack(
+            value, {i: coder.decode(body) for i, body in zip(ids, bodies)}
+        )
+        size += sum(map(len, bodies))
+    return CacheEntry(value, entry["created"], entry["delta"], entry["expire"], size)
+
+
+async def set_cached(
+    redis, coder, cache_key: str, value, expire: int, tags, delta: float = 0.0
+) -> CacheEntry:
+    """
+    Ключ живет в Redis дольше своего TTL на CACHE_STALE_TTL секунд:
+    в этом окне значение отдается устаревшим, пока идет пересчет.
+    Ключ помечается и тегами своих статей, чтобы изменение статьи удаляло
+    его по имени, в том числе из памяти воркеров.
+    """
+    packed, bodies = store.pack(value)
+    created = time.time()
+    encoded = coder.encode(
+        {"value": packed, "created": created, "delta": delta, "expire": expire}
+    )
+    encoded_bodies = {i: coder.encode(body) for i, body in bodies.items()}
+    ttl = expire + settings.CACHE_STALE_TTL
+    article_ttl = max(ttl, ARTICLE_EXPIRE)
+    async with redis.pipeline(transaction=False) as pipe:
+        pipe.set(cache_key, encoded, ex=ttl)
+        for article_id, body in encoded_bodies.items():
+            pipe.set(store.article_key(article_id), body, ex=article_ttl)
+        await pipe.execute()
+    keys_tags = {store.article_key(i): {article_tag(i)} for i in bodies}
+    keys_tags[cache_key] = {*tags, *map(article_tag, bodies)}
+    await tag_cache_keys(keys_tags, article_ttl)
+    size = len(encoded) + sum(map(len, encoded_bodies.values()))
+    return CacheEntry(value, created, delta, expire, size)
+
+
+def remember(cache_key: str, entry: CacheEntry, version: int = 0) -> None:
+    """
+    Кладет свежее значение в память воркера, но не дольше его TTL.
+    version - версия коллекции, прочитанная до чтения значения.
+    """
+    ttl = min(settings.CACHE_L1_TTL, entry.fresh_for(time.time()))
+    if ttl > 0:
+        entry = replace(entry, version=version)
+        l1_cache.set(cache_key, entry, ttl=ttl, size=entry.size)
+
+
+def single_flight(key: str, factory: Callable[[], Awaitable]) -> asyncio.Task:
+    """
+    Возвращает уже идущую в процессе задачу для ключа или запускает новую,
+    чтобы одновременные промахи по одному ключу делали один пересчет.
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(factory())
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return task
+
+
+async def try_lock(redis, cache_key: str):
+    """Блокировка пересчета ключа между воркерами; None, если ее держит другой"""
+    lock = redis.lock(f"{cache_key}:lock", timeout=settings.CACHE_LOCK_TIMEOUT)
+    try:
+        if await lock.acquire(blocking=False):
+            return lock
+    except Exception:
+        logger.warning("Cannot lock cache key", extra={"key": cache_key}, exc_info=True)
+        return None
+    return None
+
+
+async def release(lock, cache_key: str) -> None:
+    try:
+        await lock.release()
+    except Exception:
+        # Блокировка истекла раньше, чем закончился пересчет
+        logger.warning(
+            "Cannot release cache lock", extra={"key": cache_key}, exc_info=True
+        )
+
+
+async def wait_cached(redis, coder, cache_key: str) -> Optional[CacheEntry]:
+    """Ждет, пока значение положит воркер, держащий блокировку"""
+    deadline = time.monotonic() + settings.CACHE_LOCK_WAIT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(LOCK_POLL_INTERVAL)
+        entry = await get_cached(redis, coder, cache_key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def cache(
+    expire: int, tags: Optional[TagsBuilder] = None, namespace: str = "articles"
+):
+    """
+    Кэширует результат эндпоинта в Redis бэкенда FastAPICache.
+
+    В отличие от fastapi_cache.decorator.cache, ключ помечается тегами,
+    которые строит `tags(result, kwargs)` по закодированному результату
+    и параметрам запроса, чтобы запись в DAO удаляла только затронутые ключи.
+    Статьи из результата хранятся отдельно по id (см. app.cache.store).
+
+    При промахе значение считает один запрос на ключ: в процессе - общая
+    задача, между воркерами - блокировка в Redis, остальные ждут результата.
+    Незадолго до истечения TTL (вероятностно) и в течение CACHE_STALE_TTL
+    после него запрос отдает старое значение и обновляет его в фоне.
+
+    Свежие значения дополнительно хранятся в памяти воркера (app.cache.l1)
+    и отдаются оттуда без обращения к Redis. Их нельзя изменять.
+
+    Под conditional значение из памяти отдается, только если оно не старше
+    версии коллекции, прочитанной для запроса: другие воркеры получают
+    инвалидацию по каналу позже, чем видят новую версию. Значение, посчитанное
+    до записи в коллекцию, в кэш не кладется.
+    """
+
+    def wrapper(func):
+        @wraps(func)
+        async def inner(*args, **kwargs):
+            redis = get_redis()
+            if redis is None or not FastAPICache.get_enable():
+                return to_jsonable(await func(*args, **kwargs))
+
+            coder = FastAPICache.get_coder()
+            cache_key = build_cache_key(func, namespace, kwargs)
+            collection, version = request_version.get() or (None, 0)
+            entry = l1_cache.get(cache_key)
+            if entry is not None and entry.version >= version:
+                record_cache(func.__name__, "hit_local")
+                return entry.value
+
+            async def compute():
+                started = time.perf_counter()
+                result = to_jsonable(await func(*args, **kwargs))
+                if collection is not None and await get_version(collection) != version:
+                    # Коллекция изменилась, пока считали: результат мог
+                    # прочитать старые строки, отдаем его, но не кэшируем
+                    return result
+                try:
+                    entry = await set_cached(
+                        redis,
+                        coder,
+                        cache_key,
+                        result,
+                        expire,
+                        tags(result, kwargs) if tags else (),
+                        time.perf_counter() - started,
+                    )
+                    remember(cache_key, entry, version)
+                except Exception:
+                    logger.warning(
+                        "Cannot set cache key", extra={"key": cache_key}, exc_info=True
+                    )
+                return result
+
+            async def load(wait: bool):
+                lock = await try_lock(redis, cache_key)
+                if lock is not None:
+                    try:
+                        return await compute()
+                    finally:
+                        await release(lock, cache_key)
+                if not wait:
+                    # Значение уже пересчитывает другой воркер
+                    return None
+                entry = await wait_cached(redis, coder, cache_key)
+                return entry.value if entry is not None else await compute()
+
+            async def refresh():
+                try:
+                    await load(wait=False)
+                except Exception:
+                    logger.warning(
+                        "Cannot refresh cache key",
+                        extra={"key": cache_key},
+                        exc_info=True,
+                    )
+
+            try:
+                entry = await get_cached(redis, coder, cache_key)
+            except Exception:
+                logger.warning(
+                    "Cannot get cache key", extra={"key": cache_key}, exc_info=True
+                )
+                return await compute()
+
+            if entry is not None:
+                if entry.is_fresh(time.time(), settings.CACHE_EARLY_REFRESH_BETA):
+                    record_cache(func.__name__, "hit")
+                    remember(cache_key, entry, version)
+                else:
+                    record_cache(func.__name__, "stale")
+                    single_flight(f"{cache_key}:{version}", refresh)
+                return entry.value
+
+            record_cache(func.__name__, "miss")
+
+            # Пересчет, начатый при старой версии, новому запросу не подходит
+            result = await asyncio.shield(
+                single_flight(f"{cache_key}:{version}", lambda: load(wait=True))
+            )
+            if result is None:
+                # Присоединились к фоновому обновлению, а значение уже удалено
+                result = await compute()
+            return result
+
+        return inner
+
+    return wrapper
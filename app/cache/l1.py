@@ -0,0 +1,114 @@
+"""
+Первый уровень кэша эндпоинтов - память воркера перед Redis.
+
+Когда запись в DAO удаляет ключи из Redis, их список публикуется в канал
+Redis, и каждый воркер удаляет эти ключи у себя. Короткий CACHE_L1_TTL
+ограничивает устаревание, если сообщение потерялось, а после
+переподключения к каналу кэш воркера очищается целиком.
+
+Через тот же канал согласуются другие кэши в памяти воркера, например
+кэш пользователей: они регистрируются в register_local_cache под именем,
+которое передается в publish_invalidation.
+"""
+import asyncio
+from typing import Iterable, Optional
+
+import orjson
+
+from app.cache.backend import get_redis, redis_key
+from app.cache.local import LocalTTLCache
+from app.core.config import settings
+from app.logger import logger
+
+RECONNECT_DELAY = 1.0
+
+l1_cache = LocalTTLCache(
+    maxsize=settings.CACHE_L1_MAXSIZE,
+    ttl=settings.CACHE_L1_TTL,
+    maxbytes=settings.CACHE_L1_MAXBYTES,
+)
+
+ENDPOINTS_CACHE = "endpoints"
+
+# Кэши в памяти воркера, согласованные через канал инвалидаций
+local_caches: dict[str, LocalTTLCache] = {ENDPOINTS_CACHE: l1_cache}
+
+_listener: Optional[asyncio.Task] = None
+
+
+def register_local_cache(name: str, local_cache: LocalTTLCache) -> None:
+    local_caches[name] = local_cache
+
+
+def invalidation_channel() -> str:
+    return redis_key("invalidations")
+
+
+def evict(keys: Iterable[str], cache: str = ENDPOINTS_CACHE) -> None:
+    local_cache = local_caches.get(cache)
+    if local_cache is None:
+        return
+    for key in keys:
+        local_cache.delete(key)
+
+
+def clear_local_caches() -> None:
+    for local_cache in local_caches.values():
+        local_cache.clear()
+
+
+async def publish_invalidation(keys: Iterable, cache: str = ENDPOINTS_CACHE) -> None:
+    keys = [key.decode() if isinstance(key, bytes) else key for key in keys]
+    evict(keys, cache)
+    redis = get_redis()
+    if redis is None or not keys:
+        return
+    try:
+        await redis.publish(
+            invalidation_channel(), orjson.dumps({"cache": cache, "keys": keys})
+        )
+    except Exception:
+        logger.warning("Cannot publish cache invalidation", exc_info=True)
+
+
+async def listen_invalidations() -> None:
+    while True:
+        redis = get_redis()
+        if redis is None:
+            return
+        pubsub = redis.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(invalidation_channel())
+            # Пока не были подписаны, могли пропустить инвалидации
+            clear_local_caches()
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    data = orjson.loads(message["data"])
+                    evict(data["keys"], data["cache"])
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.warning("Cache invalidation listener failed", exc_info=True)
+            clear_local_caches()
+            await asyncio.sleep(RECONNECT_DELAY)
+        finally:
+            await pubsub.close()
+
+
+def start_invalidation_listener() -> None:
+    global _listener
+    enabled = any(local_cache.maxsize > 0 for local_cache in local_caches.values())
+    if enabled and _listener is None:
+        _listener = asyncio.create_task(listen_invalidations())
+
+
+async def stop_invalidation_listener() -> None:
+    global _listener
+    if _listener is None:
+        return
+    _listener.cancel()
+    try:
+        await _listener
+    except asyncio.CancelledError:
+        pass
+    _listener = None
@@ -0,0 +1,67 @@
+"""
+Хранение статей в кэше по одному разу: списки в ключах эндпоинтов содержат
+ссылки {"$article": id}, а сами статьи лежат в ключах cache:article:{id}.
+"""
+from typing import Any, Optional
+
+from app.cache.backend import redis_key
+
+ARTICLE_FIELDS = {"id", "title", "contents", "publication_date", "author"}
+REF = "$article"
+
+
+def article_key(article_id: int) -> str:
+    return redis_key("article", article_id)
+
+
+def _is_article(value: Any) -> bool:
+    return isinstance(value, dict) and value.keys() == ARTICLE_FIELDS
+
+
+def _articles_list(value: Any) -> Optional[list]:
+    if isinstance(value, list):
+        return value
+    if isinstance(value, dict) and isinstance(value.get("items"), list):
+        return value["items"]
+    return None
+
+
+def _with_articles_list(value: Any, articles: list) -> Any:
+    if isinstance(value, list):
+        return articles
+    return {**value, "items": articles}
+
+
+def pack(value: Any) -> tuple[Any, dict]:
+    """
+    Заменяет статьи в списке (или в поле items) ссылками.
+
+    :return: Значение со ссылками и статьи по id.
+    """
+    articles = _articles_list(value)
+    if not articles:
+        return value, {}
+    bodies, packed = {}, []
+    for item in articles:
+        if _is_article(item):
+            bodies[item["id"]] = item
+            packed.append({REF: item["id"]})
+        else:
+            packed.append(item)
+    return _with_articles_list(value, packed), bodies
+
+
+def references(value: Any) -> list[int]:
+    articles = _articles_list(value) or []
+    return [item[REF] for item in articles if isinstance(item, dict) and REF in item]
+
+
+def unpack(value: Any, bodies: dict) -> Any:
+    articles = _articles_list(value)
+    if not articles:
+        return value
+    unpacked = [
+        bodies[item[REF]] if isinstance(item, dict) and REF in item else item
+        for item in articles
+    ]
+    return _with_articles_list(value, unpacked)
@@ -0,0 +1,99 @@
+from datetime import date
+from typing import Iterable, Union
+
+from app.cache.backend import get_redis, redis_key
+from app.cache.l1 import publish_invalidation
+from app.logger import logger
+
+# Теги коллекций статей
+ARTICLES_ALL_TAG = "articles:all"  # /articles/all
+ARTICLES_PAGES_TAG = "articles:pages"  # страницы page/per_page, сдвигаются при вставке
+ARTICLES_HEAD_TAG = "articles:head"  # первая страница курсорной пагинации
+ARTICLES_SEARCH_TAG = "articles:search"  # результаты полнотекстового поиска
+
+
+def article_tag(article_id: int) -> str:
+    return f"article:{article_id}"
+
+
+def author_tag(author_name: str) -> str:
+    return f"author:{author_name}"
+
+
+def date_tag(publication_date: Union[date, str]) -> str:
+    if isinstance(publication_date, date):
+        publication_date = publication_date.isoformat()
+    return f"date:{publication_date[:10]}"
+
+
+def _tag_key(tag: str) -> str:
+    return redis_key("tag", tag)
+
+
+async def tag_cache_key(cache_key: str, tags: Iterable[str], expire: int) -> None:
+    await tag_cache_keys({cache_key: tags}, expire)
+
+
+async def tag_cache_keys(keys_tags: dict, expire: int) -> None:
+    """
+    Регистрирует ключи кэша в множествах тегов. Множество живет не меньше,
+    чем самый долгоживущий ключ в нем.
+    """
+    redis = get_redis()
+    if redis is None:
+        return
+    async with redis.pipeline(transaction=False) as pipe:
+        for cache_key, tags in keys_tags.items():
+            for tag in set(tags):
+                pipe.sadd(_tag_key(tag), cache_key)
+                pipe.expire(_tag_key(tag), expire, gt=True)
+                pipe.expire(_tag_key(tag), expire, nx=True)
+        await pipe.execute()
+
+
+async def invalidate_tags(tags: Iterable[str]) -> None:
+    """
+    Удаляет все ключи кэша, помеченные хотя бы одним из тегов, в Redis
+    и в памяти всех воркеров.
+    Ошибки Redis не должны ломать запись в БД, поэтому только логируются.
+    """
+    redis = get_redis()
+    tags = set(tags)
+    if redis is None or not tags:
+        return
+    tag_keys = [_tag_key(tag) for tag in tags]
+    try:
+        cache_keys = await redis.sunion(tag_keys)
+        await redis.delete(*cache_keys, *tag_keys)
+    except Exception:
+        logger.warning(
+            "Cannot invalidate cache tags", extra={"tags": sorted(tags)}, exc_info=True
+        )
+        return
+    await publish_invalidation(cache_keys)
+
+
+def article_write_tags(
+    article_id: int,
+    author_name: str,
+    publication_date: date,
+    inserted: bool = False,
+    deleted: bool = False,
+) -> set:
+    """
+    Теги, которые затрагивает запись статьи. Вставка и удаление сдвигают
+    страницы page/per_page, изменение затрагивает только ключи с этой статьей.
+    Новые статьи публикуются текущей датой и попадают в начало курсорной ленты.
+    """
+    tags = {
+        ARTICLES_ALL_TAG,
+        ARTICLES_SEARCH_TAG,
+        article_tag(article_id),
+        author_tag(author_name),
+        date_tag(publication_date),
+    }
+    if inserted or deleted:
+        tags.add(ARTICLES_PAGES_TAG)
+    if inserted:
+        tags.add(ARTICLES_HEAD_TAG)
+    return tags
@@ -0,0 +1,81 @@
+"""
+Сжатые варианты ответов эндпоинтов: готовые байты тела, его тип и заголовки
+в хэше Redis и в памяти воркера.
+
+Ключ включает версию коллекции (app.cache.versions), поэтому запись в
+коллекцию делает старые варианты недостижимыми без явной инвалидации,
+а TTL только освобождает память.
+"""
+import hashlib
+from dataclasses import dataclass
+from typing import Optional
+
+import orjson
+
+from app.cache.backend import get_redis, redis_key
+from app.cache.l1 import l1_cache
+from app.core.config import settings
+from app.logger import logger
+
+
+@dataclass
+class Variant:
+    body: bytes
+    media_type: str
+    headers: dict
+
+
+def variant_key(collection: str, version: int, encoding: str, url: str) -> str:
+    digest = hashlib.md5(url.encode()).hexdigest()  # nosec: B303
+    return redis_key("response", collection, version, encoding, digest)
+
+
+async def get_variant(key: str) -> Optional[Variant]:
+    variant = l1_cache.get(key)
+    if variant is not None:
+        return variant
+    redis = get_redis()
+    if redis is None:
+        return None
+    try:
+        fields = await redis.hgetall(key)
+    except Exception:
+        logger.warning(
+            "Cannot read response variant", extra={"key": key}, exc_info=True
+        )
+        return None
+    if not fields:
+        return None
+    variant = Variant(
+        body=fields[b"body"],
+        media_type=fields[b"media_type"].decode(),
+        headers=orjson.loads(fields[b"headers"]),
+    )
+    l1_cache.set(
+        key, variant, ttl=settings.RESPONSE_COMPRESSION_TTL, size=len(variant.body)
+    )
+    return variant
+
+
+async def set_variant(key: str, variant: Variant) -> None:
+    expire = settings.RESPONSE_COMPRESSION_TTL
+    l1_cache.set(key, variant, ttl=expire, size=len(variant.body))
+    redis = get_redis()
+    if redis is None:
+        return
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hset(
+                key,
+                mapping={
+                    "body": variant.body,
+                    "media_type": variant.media_type,
+                    "headers": orjson.dumps(variant.headers),
+                },
+            )
+            pipe.expire(key, expire)
+            await pipe.execute()
+    except Exception:
+        logger.warning(
+            "Cannot store response variant", extra={"key": key}, exc_info=True
+        )
@@ -0,0 +1,68 @@
+"""
+Версии коллекций для ETag: счетчик в Redis, который увеличивается после
+каждой записи в коллекцию, когда ее ключи кэша уже удалены.
+
+Пустой счетчик начинается с текущего времени в микросекундах, а не с нуля:
+после очистки Redis версии не повторят выданные раньше ETag.
+"""
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from app.cache.backend import get_redis, redis_key
+from app.logger import logger
+
+ARTICLES_COLLECTION = "articles"
+
+# Коллекция и версия, прочитанные conditional для текущего запроса: кэш
+# эндпоинта не отдает из памяти воркера значения более старых версий
+request_version: ContextVar[Optional[tuple[str, int]]] = ContextVar(
+    "request_version", default=None
+)
+
+
+def _version_key(collection: str) -> str:
+    return redis_key("version", collection)
+
+
+def _initial_version() -> int:
+    return time.time_ns() // 1000
+
+
+async def get_version(collection: str) -> Optional[int]:
+    """Текущая версия коллекции или None, если Redis недоступен"""
+    redis = get_redis()
+    if redis is None:
+        return None
+    key = _version_key(collection)
+    try:
+        version = await redis.get(key)
+        if version is None:
+            await redis.set(key, _initial_version(), nx=True)
+            version = await redis.get(key)
+    except Exception:
+        logger.warning(
+            "Cannot read collection version",
+            extra={"collection": collection},
+            exc_info=True,
+        )
+        return None
+    return int(version)
+
+
+async def bump_version(collection: str) -> None:
+    redis = get_redis()
+    if redis is None:
+        return
+    key = _version_key(collection)
+    try:
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.set(key, _initial_version(), nx=True)
+            pipe.incr(key)
+            await pipe.execute()
+    except Exception:
+        logger.warning(
+            "Cannot bump collection version",
+            extra={"collection": collection},
+            exc_info=True,
+        )
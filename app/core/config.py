@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import Literal, Optional
 
 from pydantic_settings import BaseSettings
 
@@ -6,6 +6,17 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     MODE: Literal["DEV", "TEST", "PROD"]
     LOG_LEVEL: str
+    # Логи пишет отдельный поток: размер очереди, поведение при ее
+    # переполнении (отбросить запись или ждать до LOG_QUEUE_BLOCK_TIMEOUT)
+    # и сколько записей выводится за одну запись в поток
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_QUEUE_POLICY: Literal["drop", "block"] = "drop"
+    LOG_QUEUE_BLOCK_TIMEOUT: float = 0.1
+    LOG_BATCH_SIZE: int = 100
+    # Доля запросов, для которых логируется время обработки;
+    # запросы дольше LOG_SLOW_REQUEST_MS логируются всегда
+    LOG_REQUEST_SAMPLE_RATE: float = 1.0
+    LOG_SLOW_REQUEST_MS: float = 500
 
     DB_HOST: str
     DB_PORT: int
@@ -17,10 +28,88 @@ class Settings(BaseSettings):
     def DATABASE_URL(self):
         return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
 
+    # Пул соединений. None - значение по умолчанию для текущего MODE
+    # (см. app/db/base.py), в режиме TEST используется NullPool.
+    DB_POOL_SIZE: Optional[int] = None
+    DB_MAX_OVERFLOW: Optional[int] = None
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # 0 отключает кэши prepared statements asyncpg и SQLAlchemy и включает
+    # уникальные имена statements (нужно за pgbouncer в режиме транзакций)
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Запросы к БД дольше порога логируются вместе с маршрутом; в DEV
+    # к ним можно приложить план EXPLAIN ANALYZE (запрос выполнится повторно).
+    # Запрос, повторенный за HTTP-запрос столько раз, считается N+1 (0 - выкл.)
+    DB_SLOW_QUERY_MS: float = 200
+    DB_EXPLAIN_SLOW_QUERIES: bool = False
+    DB_N_PLUS_ONE_THRESHOLD: int = 10
+
     REDIS_HOST: str
     REDIS_PORT: int
     SECRET_KEY: str
     ALGORITHM: str
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Сессии в Redis для /refresh: срок жизни токена обновления (продлевается
+    # при каждом обновлении) и максимум сессий пользователя
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    MAX_SESSIONS_PER_USER: int = 20
+    # Проверка JWT: python-jose, pyjwt (требует установки пакета PyJWT) или
+    # hmac - встроенная проверка только для алгоритмов HS256/HS384/HS512
+    JWT_VERIFIER: Literal["jose", "pyjwt", "hmac"] = "jose"
+    # Кэш проверенных токенов: хэш токена -> claims, не дольше exp (0 - выкл.)
+    TOKEN_CACHE_MAXSIZE: int = 4096
+    TOKEN_CACHE_TTL: int = 300
+
+    # Стоимость bcrypt. Если задан BCRYPT_TARGET_MS, стоимость подбирается
+    # при старте так, чтобы хэширование занимало не больше этого времени.
+    BCRYPT_ROUNDS: int = 12
+    BCRYPT_MIN_ROUNDS: int = 10
+    BCRYPT_TARGET_MS: Optional[int] = None
+    # Потоки для bcrypt и максимум ожидающих задач, после которого отвечаем 503
+    BCRYPT_WORKERS: int = 2
+    BCRYPT_MAX_PENDING: int = 32
+
+    # Кодирование значений кэша в Redis: сериализация и сжатие больших значений.
+    # msgpack и lz4 требуют установки одноименных пакетов.
+    CACHE_CODER: Literal["orjson", "msgpack"] = "orjson"
+    CACHE_COMPRESSION: Literal["none", "zlib", "zstd", "lz4"] = "zstd"
+    CACHE_COMPRESSION_THRESHOLD: int = 1024
+
+    # Защита от лавины промахов: сколько секунд после истечения TTL отдаем
+    # устаревшее значение, пока один запрос пересчитывает его в фоне,
+    # коэффициент раннего обновления (0 - выключено) и блокировка пересчета
+    CACHE_STALE_TTL: int = 60
+    CACHE_EARLY_REFRESH_BETA: float = 1.0
+    CACHE_LOCK_TIMEOUT: int = 30
+    CACHE_LOCK_WAIT: float = 5.0
+
+    # Кэш эндпоинтов в памяти воркера перед Redis (0 записей - выключен).
+    # Согласован с другими воркерами через pub/sub, TTL - страховка от потерь.
+    CACHE_L1_MAXSIZE: int = 1024
+    CACHE_L1_MAXBYTES: int = 64 * 1024 * 1024
+    CACHE_L1_TTL: float = 5.0
+
+    # Кэш пользователей для get_current_user: LRU в процессе и опционально Redis
+    USER_CACHE_TTL: int = 30
+    USER_CACHE_MAXSIZE: int = 1024
+    USER_CACHE_REDIS: bool = False
+
+    # HTTP-кэширование списков статей: сколько секунд прокси и клиенты отдают
+    # ответ без перепроверки и сколько еще могут отдавать его, перепроверяя
+    # по ETag в фоне
+    HTTP_CACHE_MAX_AGE: int = 5
+    HTTP_CACHE_STALE_WHILE_REVALIDATE: int = 30
+
+    # Сжатие списков статей: кодировки в порядке предпочтения (br требует
+    # установки пакета brotli), минимальный размер тела и сколько секунд
+    # хранятся сжатые варианты ответа для текущей версии коллекции
+    RESPONSE_COMPRESSION_ENCODINGS: list[Literal["br", "zstd", "gzip"]] = [
+        "zstd",
+        "gzip",
+    ]
+    RESPONSE_COMPRESSION_MIN_SIZE: int = 1024
+    RESPONSE_COMPRESSION_TTL: int = 600
 
     class Config:
         env_file = ".env"
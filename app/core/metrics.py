@@ -0,0 +1,128 @@
+"""
+Метрики приложения в формате Prometheus.
+
+Под gunicorn каждый воркер пишет значения в файлы каталога
+PROMETHEUS_MULTIPROC_DIR (см. gunicorn.conf.py), и /metrics собирает их
+со всех воркеров. Без этой переменной метрики считаются в памяти процесса.
+"""
+import os
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Маршрут, если запрос не попал ни в один эндпоинт: путь в метку не пишем,
+# чтобы не плодить серии
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Время обработки запроса",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Число запросов к БД за один HTTP-запрос",
+    ["method", "route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_duration_seconds",
+    "Суммарное время запросов к БД за один HTTP-запрос",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Обращения к кэшу эндпоинтов по результату: hit_local, hit, stale, miss",
+    ["endpoint", "result"],
+)
+DB_STATEMENT_LATENCY = Histogram(
+    "db_statement_duration_seconds",
+    "Время выполнения запроса к БД по типу запроса",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_N_PLUS_ONE = Counter(
+    "db_n_plus_one_total",
+    "HTTP-запросы, в которых один и тот же запрос к БД повторился много раз",
+    ["method", "route"],
+)
+POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Соединения пула БД по состоянию, сумма по живым воркерам",
+    ["state"],
+    multiprocess_mode="livesum",
+)
+
+
+@dataclass
+class RequestStats:
+    method: str = ""
+    # scope ASGI: маршрут в нем появляется только после роутинга
+    scope: Optional[dict] = None
+    db_queries: int = 0
+    db_time: float = 0.0
+    # Текст запроса к БД -> сколько раз выполнен
+    statements: dict = field(default_factory=dict)
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route") if self.scope is not None else None
+        return route.path if route is not None else UNMATCHED_ROUTE
+
+
+# Статистика текущего HTTP-запроса, ее заполняют обработчики событий БД
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar(
+    "request_stats", default=None
+)
+
+
+def record_query(statement: str, operation: str, duration: float) -> None:
+    DB_STATEMENT_LATENCY.labels(operation).observe(duration)
+    stats = request_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_time += duration
+        stats.statements[statement] = stats.statements.get(statement, 0) + 1
+
+
+def record_cache(endpoint: str, result: str) -> None:
+    CACHE_REQUESTS.labels(endpoint, result).inc()
+
+
+def observe_request(status: int, duration: float, stats: RequestStats) -> None:
+    method, route = stats.method, stats.route
+    REQUEST_LATENCY.labels(method, route, status).observe(duration)
+    REQUEST_DB_QUERIES.labels(method, route).observe(stats.db_queries)
+    REQUEST_DB_TIME.labels(method, route).observe(stats.db_time)
+
+
+def observe_pool(pool_stats: dict) -> None:
+    for state in ("checked_in", "checked_out", "overflow"):
+        if state in pool_stats:
+            POOL_CONNECTIONS.labels(state).set(pool_stats[state])
+
+
+def render() -> tuple[bytes, str]:
+    """Текст метрик всех воркеров и его Content-Type"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,30 @@
+from collections.abc import Mapping
+from typing import Any
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    return jsonable_encoder(obj)
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Сериализует строки БД (RowMapping), словари, pydantic-модели и даты
+    через orjson. Медленный jsonable_encoder вызывается только для
+    остальных объектов, например ORM-моделей.
+    """
+    return orjson.dumps(value, default=_default)
+
+
+def to_jsonable(value: Any) -> Any:
+    """
+    Приводит значение к чистым JSON-типам (даты - в строки ISO).
+    """
+    return orjson.loads(dumps(value))
@@ -1,16 +1,143 @@
-from sqlalchemy import NullPool, select
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from uuid import uuid4
+
+from sqlalchemy import NullPool, event, func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
 from app.core.config import settings
+from app.db import instrumentation
 
 DATABASE_URL = settings.DATABASE_URL
-DATABASE_PARAMS = {}
+
+# Размеры пула по умолчанию на один процесс gunicorn:
+# (pool_size + max_overflow) * workers должно быть меньше max_connections Postgres
+POOL_DEFAULTS = {
+    "DEV": {"pool_size": 5, "max_overflow": 5},
+    "PROD": {"pool_size": 10, "max_overflow": 10},
+}
+
+
+def get_connect_args() -> dict:
+    """
+    Кэши prepared statements: asyncpg (statement_cache_size) и диалекта
+    SQLAlchemy (prepared_statement_cache_size). С DB_STATEMENT_CACHE_SIZE=0
+    выключены оба, а имена statements уникальны, чтобы за pgbouncer в режиме
+    транзакций они не пересекались на общем серверном соединении.
+    """
+    cache_size = settings.DB_STATEMENT_CACHE_SIZE
+    connect_args = {
+        "statement_cache_size": cache_size,
+        "prepared_statement_cache_size": cache_size,
+    }
+    if cache_size == 0:
+        connect_args["prepared_statement_name_func"] = (
+            lambda: f"__asyncpg_{uuid4()}__"
+        )
+    return connect_args
+
+
+def get_database_params() -> dict:
+    connect_args = get_connect_args()
+    if settings.MODE == "TEST":
+        return {"poolclass": NullPool, "connect_args": connect_args}
+    defaults = POOL_DEFAULTS[settings.MODE]
+    return {
+        "pool_size": (
+            settings.DB_POOL_SIZE
+            if settings.DB_POOL_SIZE is not None
+            else defaults["pool_size"]
+        ),
+        "max_overflow": (
+            settings.DB_MAX_OVERFLOW
+            if settings.DB_MAX_OVERFLOW is not None
+            else defaults["max_overflow"]
+        ),
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
+
+
+DATABASE_PARAMS = get_database_params()
 
 engine = create_async_engine(DATABASE_URL, **DATABASE_PARAMS)
 
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
+# Ключи session.info сессии запроса
+REQUEST_SCOPED = "request_scoped"
+AFTER_COMMIT = "after_commit"
+
+
+# Время каждого запроса к БД, медленные запросы и N+1 (см. app.db.instrumentation)
+event.listen(
+    engine.sync_engine, "before_cursor_execute", instrumentation.before_cursor_execute
+)
+event.listen(
+    engine.sync_engine, "after_cursor_execute", instrumentation.after_cursor_execute
+)
+
+
+def get_pool_stats() -> dict:
+    """
+    Состояние пула соединений текущего процесса.
+    """
+    pool = engine.pool
+    if isinstance(pool, NullPool):
+        return {"class": type(pool).__name__}
+    return {
+        "class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": DATABASE_PARAMS["max_overflow"],
+    }
+
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    """
+    Зависимость FastAPI: одна сессия, соединение и транзакция на HTTP-запрос.
+    DAO, получившие эту сессию, не коммитят ее сами: коммит делается после
+    эндпоинта (и до отправки ответа), затем выполняются отложенные действия
+    вроде инвалидации кэша. При исключении транзакция откатывается.
+    """
+    async with async_session_maker() as session:
+        session.info[REQUEST_SCOPED] = True
+        yield session
+        await session.commit()
+    for callback, args in session.info.get(AFTER_COMMIT, ()):
+        await callback(*args)
+
+
+@asynccontextmanager
+async def session_scope(
+    session: Optional[AsyncSession] = None,
+) -> AsyncIterator[AsyncSession]:
+    """Переданная сессия запроса или собственная сессия вызова DAO"""
+    if session is not None:
+        yield session
+        return
+    async with async_session_maker() as session:
+        yield session
+
+
+async def commit(session: AsyncSession) -> None:
+    """Коммитит собственную сессию DAO, сессию запроса коммитит get_session"""
+    if not session.info.get(REQUEST_SCOPED):
+        await session.commit()
+
+
+async def after_commit(session: AsyncSession, callback, *args) -> None:
+    """Выполняет callback сразу или, для сессии запроса, после ее коммита"""
+    if session.info.get(REQUEST_SCOPED):
+        session.info.setdefault(AFTER_COMMIT, []).append((callback, args))
+    else:
+        await callback(*args)
+
 
 class Base(DeclarativeBase):
     pass
@@ -19,20 +146,44 @@ class Base(DeclarativeBase):
 class BaseDAO:
     """
     DAO - Data Access Object
+
+    Методы принимают необязательную сессию запроса (см. get_session),
+    без нее каждый вызов открывает свою сессию, как в скриптах и тестах.
     """
 
     model = None
 
     @classmethod
-    async def find_one_or_none(cls, **filter_by):
-        async with async_session_maker() as session:
-            query = select(cls.model.__table__.columns).filter_by(**filter_by)
+    def columns(cls) -> list:
+        """
+        Колонки модели без отложенных (deferred), например вычисляемых
+        служебных полей, которые не нужны в ответах API.
+        """
+        return [
+            attr.columns[0]
+            for attr in inspect(cls.model).column_attrs
+            if not attr.deferred
+        ]
+
+    @classmethod
+    async def find_one_or_none(
+        cls, session: Optional[AsyncSession] = None, **filter_by
+    ):
+        async with session_scope(session) as session:
+            query = select(*cls.columns()).filter_by(**filter_by)
             result = await session.execute(query)
             return result.mappings().one_or_none()
 
     @classmethod
-    async def find_all(cls, **filter_by):
-        async with async_session_maker() as session:
-            query = select(cls.model.__table__.columns).filter_by(**filter_by)
+    async def find_all(cls, session: Optional[AsyncSession] = None, **filter_by):
+        async with session_scope(session) as session:
+            query = select(*cls.columns()).filter_by(**filter_by)
             result = await session.execute(query)
             return result.mappings().all()
+
+    @classmethod
+    async def count(cls, session: Optional[AsyncSession] = None, **filter_by) -> int:
+        async with session_scope(session) as session:
+            query = select(func.count()).select_from(cls.model).filter_by(**filter_by)
+            result = await session.execute(query)
+            return result.scalar_one()
@@ -0,0 +1,94 @@
+"""
+Инструментирование запросов к БД: обработчики событий курсора движка
+(регистрируются в app.db.base), лог медленных запросов с маршрутом,
+по которому они пришли, и поиск N+1 в рамках одного HTTP-запроса.
+
+Параметры запросов в лог не попадают: в них бывают хэши паролей.
+"""
+import time
+
+from app.core.config import settings
+from app.core.metrics import DB_N_PLUS_ONE, RequestStats, record_query, request_stats
+from app.logger import logger
+
+OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}
+
+
+def get_operation(statement: str) -> str:
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+    return operation if operation in OPERATIONS else "OTHER"
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context.query_started = time.perf_counter()
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - context.query_started
+    operation = get_operation(statement)
+    record_query(statement, operation, duration)
+    if duration * 1000 < settings.DB_SLOW_QUERY_MS:
+        return
+
+    stats = request_stats.get()
+    extra = {
+        "statement": statement,
+        "duration_ms": round(duration * 1000, 2),
+        "route": stats.route if stats is not None else None,
+        "method": stats.method if stats is not None else None,
+    }
+    if (
+        settings.DB_EXPLAIN_SLOW_QUERIES
+        and settings.MODE == "DEV"
+        and operation == "SELECT"
+        and not executemany
+        and not context.is_server_side
+    ):
+        extra["plan"] = explain_analyze(conn, statement, parameters)
+    logger.warning("Slow query", extra=extra)
+
+
+def explain_analyze(conn, statement, parameters) -> str:
+    """
+    План медленного SELECT через EXPLAIN ANALYZE на том же соединении.
+    Запрос выполняется повторно, поэтому режим только для разработки.
+    Отдельный курсор DBAPI не вызывает события движка и не трогает
+    результат исходного запроса.
+    """
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters)
+        return "\n".join(row[0] for row in cursor.fetchall())
+    except Exception:
+        logger.warning("Cannot explain slow query", exc_info=True)
+        return ""
+    finally:
+        cursor.close()
+
+
+def check_n_plus_one(stats: RequestStats) -> None:
+    """
+    Один и тот же запрос, выполненный за HTTP-запрос не меньше
+    DB_N_PLUS_ONE_THRESHOLD раз, обычно означает загрузку в цикле.
+    """
+    threshold = settings.DB_N_PLUS_ONE_THRESHOLD
+    if threshold <= 0:
+        return
+    repeated = {
+        statement: count
+        for statement, count in stats.statements.items()
+        if count >= threshold
+    }
+    if not repeated:
+        return
+    DB_N_PLUS_ONE.labels(stats.method, stats.route).inc()
+    for statement, count in repeated.items():
+        logger.warning(
+            "Possible N+1 query",
+            extra={
+                "statement": statement,
+                "count": count,
+                "route": stats.route,
+                "method": stats.method,
+            },
+        )
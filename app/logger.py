@@ -1,5 +1,10 @@
+import atexit
+import copy
 import logging
+import os
+import queue
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 
 from pythonjsonlogger import jsonlogger
 
@@ -7,25 +12,160 @@ from app.core.config import settings
 
 logger = logging.getLogger()
 
-logHandler = logging.StreamHandler()
-
 
 class CustomJsonFormatter(jsonlogger.JsonFormatter):
     def add_fields(self, log_record, record, message_dict):
         super(CustomJsonFormatter, self).add_fields(log_record, record, message_dict)
         if not log_record.get("timestamp"):
-            now = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%S.%fZ")
-            log_record["timestamp"] = now
+            # Запись форматируется в потоке логирования, поэтому время берем
+            # из момента создания записи, а не текущее
+            now = datetime.utcfromtimestamp(record.created)
+            log_record["timestamp"] = now.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
         if log_record.get("level"):
             log_record["level"] = log_record["level"].upper()
         else:
             log_record["level"] = record.levelname
 
 
+class BoundedQueueHandler(QueueHandler):
+    """
+    Кладет записи в ограниченную очередь вместо записи в поток вывода.
+    Когда очередь заполнена, запись отбрасывается (policy="drop") или
+    ждет места не дольше block_timeout секунд (policy="block").
+    """
+
+    def __init__(self, queue_size: int, policy: str, block_timeout: float):
+        super().__init__(queue.Queue(maxsize=queue_size))
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+
+    def prepare(self, record):
+        # В отличие от QueueHandler.prepare не форматируем запись целиком:
+        # JSON собирается в потоке логирования. Здесь фиксируем только
+        # сообщение и текст исключения, которые могут измениться позже.
+        # Запись копируется: ее же получают остальные обработчики логгера.
+        record = copy.copy(record)
+        if not isinstance(record.msg, dict):
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            if self.policy == "block":
+                self.queue.put(record, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchQueueListener(QueueListener):
+    """
+    Забирает из очереди все накопившиеся записи (не больше batch_size)
+    и пишет их в поток одной операцией.
+    """
+
+    def __init__(self, queue_handler: BoundedQueueHandler, stream_handler, batch_size):
+        super().__init__(
+            queue_handler.queue, stream_handler, respect_handler_level=True
+        )
+        self.queue_handler = queue_handler
+        self.batch_size = batch_size
+
+    def enqueue_sentinel(self):
+        # QueueListener.stop кладет маркер через put_nowait, и при полной
+        # очереди на выходе получал бы queue.Full. Ждем, пока поток
+        # освободит место: он разбирает очередь, пока не встретит маркер.
+        self.queue.put(self._sentinel)
+
+    def _monitor(self):
+        stopped = False
+        while not stopped:
+            batch = [self.dequeue(True)]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            fetched = len(batch)
+            if self._sentinel in batch:
+                batch = batch[: batch.index(self._sentinel)]
+                stopped = True
+            self.write(batch)
+            for _ in range(fetched):
+                self.queue.task_done()
+
+    def write(self, records: list) -> None:
+        handler = self.handlers[0]
+        dropped, self.queue_handler.dropped = self.queue_handler.dropped, 0
+        if dropped:
+            records.append(
+                logger.makeRecord(
+                    logger.name,
+                    logging.WARNING,
+                    __file__,
+                    0,
+                    "Log records dropped",
+                    None,
+                    None,
+                    func="write",
+                    extra={"dropped": dropped},
+                )
+            )
+        lines = []
+        for record in records:
+            if record.levelno < handler.level:
+                continue
+            try:
+                lines.append(handler.format(record))
+            except Exception:
+                handler.handleError(record)
+        if not lines:
+            return
+        with handler.lock:
+            handler.stream.write("\n".join(lines) + "\n")
+            handler.flush()
+
+
 formatter = CustomJsonFormatter(
     "%(timestamp)s %(level)s %(message)s %(module)s %(funcName)s"
 )
 
+logHandler = logging.StreamHandler()
 logHandler.setFormatter(formatter)
-logger.addHandler(logHandler)
+
+queueHandler = BoundedQueueHandler(
+    settings.LOG_QUEUE_SIZE, settings.LOG_QUEUE_POLICY, settings.LOG_QUEUE_BLOCK_TIMEOUT
+)
+logListener = BatchQueueListener(queueHandler, logHandler, settings.LOG_BATCH_SIZE)
+
+
+def restart_log_listener():
+    """
+    Поток логирования не переживает fork (gunicorn --preload),
+    поэтому в дочернем процессе создаем очередь и поток заново.
+    """
+    global logListener
+    queueHandler.queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    queueHandler.dropped = 0
+    logListener = BatchQueueListener(queueHandler, logHandler, settings.LOG_BATCH_SIZE)
+    logListener.start()
+
+
+def stop_log_listener():
+    # Дописываем оставшиеся в очереди записи при выходе
+    if logListener._thread is not None:
+        logListener.stop()
+
+
+logger.addHandler(queueHandler)
 logger.setLevel(settings.LOG_LEVEL)
+logListener.start()
+atexit.register(stop_log_listener)
+os.register_at_fork(after_in_child=restart_log_listener)
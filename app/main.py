@@ -1,14 +1,25 @@
+import random
 import time
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
 from redis import asyncio as aioredis
 
+from app.api.auth.auth import configure_password_hashing
 from app.api.endpoints.article import router as router_articles
+from app.api.endpoints.health import router as router_health
+from app.api.endpoints.metrics import router as router_metrics
 from app.api.endpoints.user import router as router_auth
+from app.cache.backend import CACHE_PREFIX
+from app.cache.coder import get_cache_coder
+from app.cache.l1 import start_invalidation_listener, stop_invalidation_listener
 from app.core.config import settings
+from app.core.metrics import RequestStats, observe_pool, observe_request, request_stats
+from app.db.base import get_pool_stats
+from app.db.instrumentation import check_n_plus_one
 from app.logger import logger
 
 app = FastAPI(
@@ -16,10 +27,13 @@ app = FastAPI(
     version="0.1.0",
     root_path="",
     openapi_url="/api/openapi.json",  # Указываем URL для OpenAPI
+    default_response_class=ORJSONResponse,
 )
 
 app.include_router(router_articles)
 app.include_router(router_auth)
+app.include_router(router_health)
+app.include_router(router_metrics)
 
 # Подключение CORS, чтобы запросы к API могли приходить из браузера
 origins = [
@@ -38,24 +52,53 @@ app.add_middleware(
         "Access-Control-Allow-Headers",
         "Access-Control-Allow-Origin",
         "Authorization",
+        "If-None-Match",
     ],
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "X-Process-Time", "ETag"],
 )
 
 
 @app.on_event("startup")
-def startup():
+async def startup():
+    configure_password_hashing()
     redis = aioredis.from_url(
         f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}",
         encoding="utf8",
-        decode_responses=True,
+        decode_responses=False,
     )
-    FastAPICache.init(RedisBackend(redis), prefix="cache")
+    FastAPICache.init(RedisBackend(redis), prefix=CACHE_PREFIX, coder=get_cache_coder())
+    start_invalidation_listener()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await stop_invalidation_listener()
 
 
 @app.middleware("http")
 async def add_process_time_header(request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    logger.info("Request handling time", extra={"process_time": round(process_time, 4)})
+    stats = RequestStats(method=request.method, scope=request.scope)
+    token = request_stats.set(stats)
+    start_time = time.perf_counter()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    except Exception:
+        status = 500
+        raise
+    finally:
+        process_time = time.perf_counter() - start_time
+        request_stats.reset(token)
+        observe_request(status, process_time, stats)
+        observe_pool(get_pool_stats())
+        check_n_plus_one(stats)
+    response.headers["X-Process-Time"] = f"{process_time:.4f}"
+    # Время обработки логируем выборочно, медленные запросы - всегда
+    if (
+        process_time * 1000 >= settings.LOG_SLOW_REQUEST_MS
+        or random.random() < settings.LOG_REQUEST_SAMPLE_RATE
+    ):
+        logger.info(
+            "Request handling time", extra={"process_time": round(process_time, 4)}
+        )
     return response
@@ -1,30 +1,29 @@
+"""
+Тесты API требуют запущенных PostgreSQL (тестовая БД) и Redis: lifespan
+приложения подключает FastAPICache к Redis, и эндпоинты проходят через все
+уровни кэша - Redis, память воркера, сжатые варианты и версии коллекций.
+Перед каждым тестом ключи приложения в Redis и кэши в памяти очищаются,
+чтобы тесты не зависели от порядка и от прошлых прогонов.
+"""
 import asyncio
 import json
 from datetime import datetime
-from unittest import mock
 
 import pytest
+from redis import asyncio as aioredis
 from asgi_lifespan import LifespanManager
 from httpx import AsyncClient
 from sqlalchemy import insert
 
 from app.api.models.article import Article
 from app.api.models.user import User
+from app.cache.backend import CACHE_PREFIX, get_redis
+from app.cache.l1 import clear_local_caches
 from app.core.config import settings
 from app.db.base import Base, async_session_maker, engine
 from app.main import app as fastapi_app
 
 
-def mock_cache():
-    mock.patch(
-        "fastapi_cache.decorator.cache", lambda *args, **kwargs: lambda f: f
-    ).start()
-
-
-def pytest_sessionstart(session):
-    mock_cache()
-
-
 @pytest.fixture(scope="session", autouse=True)
 async def prepare_database():
     # Обязательно убеждаемся, что работаем с тестовой БД
@@ -69,6 +68,21 @@ def event_loop(request):
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+async def clean_cache():
+    "Очищает кэши в памяти и ключи приложения в Redis перед тестом"
+    clear_local_caches()
+    # До первого lifespan FastAPICache еще не подключен к Redis
+    redis = get_redis() or aioredis.from_url(
+        f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}"
+    )
+    keys = [key async for key in redis.scan_iter(f"{CACHE_PREFIX}:*")]
+    if keys:
+        await redis.delete(*keys)
+    if get_redis() is None:
+        await redis.close()
+
+
 @pytest.fixture(scope="function")
 async def ac():
     "Асинхронный клиент для тестирования эндпоинтов"
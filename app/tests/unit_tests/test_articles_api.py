@@ -1,6 +1,11 @@
+import asyncio
+import json
+
 import pytest
 from httpx import AsyncClient
 
+from app.cache.l1 import l1_cache
+
 
 async def test_get_all_articles(ac: AsyncClient):
     response = await ac.get("/articles/all")
@@ -30,6 +35,21 @@ async def test_get_sort_by_author_articles(author_name, len_responce, ac: AsyncC
     assert len(response.json()) == len_responce
 
 
+async def test_get_articles_by_author_is_limited(ac: AsyncClient):
+    response = await ac.get(
+        "/articles/articles", params={"author_name": "testuser2", "per_page": 1}
+    )
+    assert len(response.json()) == 1
+
+
+@pytest.mark.parametrize("per_page", [0, -1])
+async def test_get_articles_by_author_rejects_bad_per_page(per_page, ac: AsyncClient):
+    response = await ac.get(
+        "/articles/articles", params={"author_name": "testuser2", "per_page": per_page}
+    )
+    assert response.status_code == 422
+
+
 @pytest.mark.parametrize(
     "publication_date, len_responce",
     [("2024-01-01", 0), ("2024-01-06", 2), ("YYYY-MM-DD", 0)],
@@ -109,3 +129,226 @@ async def test_delete_articles_by_authentificated_user_when_article_not_found(
 ):
     response = await authenticated_ac.delete(f"/articles/delete/{100}")
     assert response.status_code == 404
+
+
+async def test_get_cursor_page_articles(ac: AsyncClient):
+    seen_ids = []
+    cursor = None
+    while True:
+        params = {"per_page": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = await ac.get("/articles/cursor_page", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page["items"]) <= 2
+        seen_ids.extend(article["id"] for article in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert len(seen_ids) == len(set(seen_ids))
+
+
+async def test_get_cursor_page_articles_with_incorrect_cursor(ac: AsyncClient):
+    response = await ac.get("/articles/cursor_page", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+async def test_get_sort_by_author_articles_by_pages(ac: AsyncClient):
+    response = await ac.get(
+        "/articles/sort_by_author/testuser2", params={"per_page": 1}
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert response.headers["X-Total-Count"] == "2"
+
+    response = await ac.get(
+        "/articles/sort_by_author/testuser2",
+        params={"per_page": 1, "cursor": response.headers["X-Next-Cursor"]},
+    )
+    assert len(response.json()) == 1
+    assert "X-Next-Cursor" not in response.headers
+
+
+async def test_get_sort_by_author_articles_page_size_is_limited(ac: AsyncClient):
+    response = await ac.get(
+        "/articles/sort_by_author/testuser2", params={"per_page": 1000}
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("format", ["ndjson", "json"])
+async def test_export_articles(format, ac: AsyncClient):
+    all_articles = (await ac.get("/articles/all")).json()
+    response = await ac.get("/articles/export", params={"format": format})
+    assert response.status_code == 200
+    if format == "ndjson":
+        exported = [json.loads(line) for line in response.text.splitlines()]
+    else:
+        exported = response.json()
+    assert sorted(a["id"] for a in exported) == sorted(a["id"] for a in all_articles)
+
+
+@pytest.mark.parametrize(
+    "q, len_responce", [("Wolfenstein", 1), ("zzzzz", 0)]
+)
+async def test_search_articles(q, len_responce, ac: AsyncClient):
+    response = await ac.get("/articles/search", params={"q": q})
+    assert response.status_code == 200
+    assert len(response.json()) == len_responce
+    for article in response.json():
+        assert "<b>Wolfenstein</b>" in article["snippet"]
+
+
+async def test_search_snippet_is_escaped(authenticated_ac: AsyncClient):
+    response = await authenticated_ac.post(
+        "/articles/create",
+        json={
+            "title": "Escape test",
+            "contents": "Zebrafinch <script>alert(1)</script> zebrafinch",
+        },
+    )
+    assert response.status_code == 201
+    article_id = response.json()["id"]
+
+    response = await authenticated_ac.get(
+        "/articles/search", params={"q": "zebrafinch"}
+    )
+    snippet = response.json()[0]["snippet"]
+    assert "<script>" not in snippet
+    assert "&lt;script&gt;" in snippet
+    assert "<b>Zebrafinch</b>" in snippet
+
+    await authenticated_ac.delete(f"/articles/delete/{article_id}")
+
+
+async def test_summary_page_has_no_contents(ac: AsyncClient):
+    response = await ac.get("/articles/summary/page", params={"per_page": 3})
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    for article in response.json():
+        assert "contents" not in article
+        assert "excerpt" not in article
+
+
+async def test_summary_excerpt_and_cursor(ac: AsyncClient):
+    response = await ac.get(
+        "/articles/summary/by_author/testuser2", params={"per_page": 1, "excerpt": 20}
+    )
+    page = response.json()
+    assert len(page["items"]) == 1
+    assert len(page["items"][0]["excerpt"]) <= 20
+    assert page["next_cursor"]
+
+    response = await ac.get(
+        "/articles/summary/by_author/testuser2",
+        params={"per_page": 1, "cursor": page["next_cursor"]},
+    )
+    assert len(response.json()["items"]) == 1
+    assert response.json()["next_cursor"] is None
+
+
+@pytest.mark.parametrize("article_id, status_code", [(2, 200), (100, 404)])
+async def test_get_article_by_id(article_id, status_code, ac: AsyncClient):
+    response = await ac.get(f"/articles/id/{article_id}")
+    assert response.status_code == status_code
+    if status_code == 200:
+        assert response.json()["contents"]
+
+
+async def test_not_modified_by_etag(ac: AsyncClient):
+    response = await ac.get("/articles/summary/page")
+    etag = response.headers["ETag"]
+    assert "max-age" in response.headers["Cache-Control"]
+
+    response = await ac.get("/articles/summary/page", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert not response.content
+
+
+async def test_compressed_response(ac: AsyncClient):
+    response = await ac.get("/articles/all", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"].endswith('-gzip"')
+    # httpx распаковывает gzip сам
+    assert isinstance(response.json(), list)
+
+    response = await ac.get("/articles/all", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+
+
+async def test_stale_local_cache_is_not_served(authenticated_ac: AsyncClient):
+    response = await authenticated_ac.post(
+        "/articles/create", json={"title": "Old title", "contents": "Contents"}
+    )
+    article_id = response.json()["id"]
+    url = f"/articles/id/{article_id}"
+    await authenticated_ac.get(url, headers={"Accept-Encoding": "identity"})
+    stale = dict(l1_cache._data)
+
+    response = await authenticated_ac.put(
+        f"/articles/edit/{article_id}", json={"title": "New title", "contents": "-"}
+    )
+    assert response.status_code == 200
+    # Воркер, до которого инвалидация из канала еще не дошла
+    await asyncio.sleep(0.1)
+    l1_cache._data.update(stale)
+
+    response = await authenticated_ac.get(url, headers={"Accept-Encoding": "gzip"})
+    assert response.json()["title"] == "New title"
+
+    await authenticated_ac.delete(f"/articles/delete/{article_id}")
+
+
+async def test_bulk_create_edit_delete_articles(authenticated_ac: AsyncClient):
+    response = await authenticated_ac.post(
+        "/articles/bulk/create",
+        json=[
+            {"title": "Bulk title 1", "contents": "Bulk contents 1"},
+            {"title": "Bulk title 2", "contents": "Bulk contents 2"},
+        ],
+    )
+    assert response.status_code == 201
+    ids = [article["id"] for article in response.json()]
+    assert len(ids) == 2
+
+    response = await authenticated_ac.put(
+        "/articles/bulk/edit",
+        json=[
+            {"id": ids[0], "title": "Edit title", "contents": "Edit contents"},
+            {"id": 4, "title": "Edit title", "contents": "Edit contents"},
+            {"id": 100, "title": "Edit title", "contents": "Edit contents"},
+        ],
+    )
+    assert response.status_code == 200
+    assert [item["status"] for item in response.json()] == [
+        "updated",
+        "forbidden",
+        "not_found",
+    ]
+
+    response = await authenticated_ac.post("/articles/bulk/delete", json=[*ids, 4, 100])
+    assert response.status_code == 200
+    assert [item["status"] for item in response.json()] == [
+        "deleted",
+        "deleted",
+        "forbidden",
+        "not_found",
+    ]
+
+
+async def test_bulk_duplicate_ids_are_rejected(authenticated_ac: AsyncClient):
+    response = await authenticated_ac.post("/articles/bulk/delete", json=[100, 100])
+    assert response.status_code == 422
+
+    response = await authenticated_ac.put(
+        "/articles/bulk/edit",
+        json=[{"id": 100, "title": "Title", "contents": "Contents"}] * 2,
+    )
+    assert response.status_code == 422
+
+
+async def test_bulk_delete_articles_by_non_authentificated_user(ac: AsyncClient):
+    response = await ac.post("/articles/bulk/delete", json=[1])
+    assert response.status_code == 401
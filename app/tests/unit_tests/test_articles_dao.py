@@ -1,7 +1,8 @@
 import pytest
 
-from app.api.dao.articledao import ArticleDAO
+from app.api.dao.articledao import ArticleDAO, highlight_snippet
 from app.api.exceptions.exceptions import UserNotFoundException
+from app.db.base import get_session
 
 
 @pytest.mark.parametrize("id,is_present", [(2, True), (4, True), (100, False)])
@@ -35,3 +36,31 @@ async def test_find_articles_by_author(author):
         assert find_article is not None
     except UserNotFoundException as e:
         assert False, f"User '{author}' not found in the database: {e}"
+
+
+async def test_request_session_commits_once():
+    sessions = get_session()
+    session = await anext(sessions)
+    status = await ArticleDAO.update_article_checked(
+        article_id=2,
+        article_data={"title": "Одна транзакция", "contents": "Текст"},
+        user_name="testuser",
+        is_admin=True,
+        session=session,
+    )
+    article = await ArticleDAO.find_one_or_none(session=session, id=2)
+    assert status == "updated"
+    assert article["title"] == "Одна транзакция"
+    # Другие сессии не видят изменение до коммита в конце запроса
+    assert (await ArticleDAO.find_one_or_none(id=2))["title"] != "Одна транзакция"
+
+    with pytest.raises(StopAsyncIteration):
+        await anext(sessions)
+    assert (await ArticleDAO.find_one_or_none(id=2))["title"] == "Одна транзакция"
+
+
+def test_highlight_snippet_escapes_html():
+    snippet = "\x02Код\x03 <img src=x onerror=alert(1)>"
+    assert highlight_snippet(snippet) == (
+        "<b>Код</b> &lt;img src=x onerror=alert(1)&gt;"
+    )
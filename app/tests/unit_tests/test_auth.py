@@ -0,0 +1,36 @@
+import asyncio
+import time
+
+import pytest
+
+from app.api.auth.auth import (
+    MAX_BCRYPT_ROUNDS,
+    BoundedExecutor,
+    get_password_hash_async,
+    tune_bcrypt_rounds,
+    verify_password_async,
+)
+from app.api.exceptions.exceptions import ServiceOverloadedException
+from app.core.config import settings
+
+
+async def test_password_hash_in_executor():
+    hashed_password = await get_password_hash_async("test")
+    assert await verify_password_async("test", hashed_password)
+    assert not await verify_password_async("wrong", hashed_password)
+
+
+async def test_bounded_executor_rejects_when_saturated():
+    executor = BoundedExecutor(max_workers=1, max_pending=1, name="test")
+    task = asyncio.create_task(executor.run(time.sleep, 0.2))
+    await asyncio.sleep(0)
+    with pytest.raises(ServiceOverloadedException):
+        await executor.run(time.sleep, 0)
+    await task
+    assert executor.pending == 0
+
+
+@pytest.mark.parametrize("target_ms", [1, 100000])
+def test_tune_bcrypt_rounds_is_clamped(target_ms):
+    rounds = tune_bcrypt_rounds(target_ms)
+    assert settings.BCRYPT_MIN_ROUNDS <= rounds <= MAX_BCRYPT_ROUNDS
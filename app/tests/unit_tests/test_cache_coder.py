@@ -0,0 +1,43 @@
+import pytest
+
+from app.cache import store
+from app.cache.coder import RAW, ZSTD, CompactCoder
+
+ARTICLE = {
+    "id": 1,
+    "title": "Кошачье фортепиано",
+    "contents": "Вымышленный музыкальный инструмент " * 50,
+    "publication_date": "2024-01-06",
+    "author": "testuser",
+}
+
+
+@pytest.mark.parametrize("serializer", ["orjson", "msgpack"])
+@pytest.mark.parametrize("compression", ["none", "zlib", "zstd", "lz4"])
+def test_coder_roundtrip(serializer, compression):
+    coder = CompactCoder(serializer, compression, threshold=256)
+    value = {"items": [ARTICLE], "next_cursor": None}
+    assert coder.decode(coder.encode(value)) == value
+
+
+def test_coder_compresses_only_large_values():
+    coder = CompactCoder("orjson", "zstd", threshold=256)
+    assert coder.encode({"id": 1})[:1] == RAW
+    encoded = coder.encode([ARTICLE])
+    assert encoded[:1] == ZSTD
+    assert len(encoded) < len(ARTICLE["contents"])
+
+
+def test_store_keeps_articles_once():
+    value = {"items": [ARTICLE], "next_cursor": "cursor", "total": 1}
+    packed, bodies = store.pack(value)
+    assert bodies == {1: ARTICLE}
+    assert store.references(packed) == [1]
+    assert store.unpack(packed, bodies) == value
+
+
+def test_store_skips_not_article_items():
+    value = [{"id": 1, "title": "t", "rank": 0.1, "snippet": "s"}]
+    packed, bodies = store.pack(value)
+    assert packed == value
+    assert bodies == {}
@@ -0,0 +1,16 @@
+from app.cache.decorator import CacheEntry
+
+
+def test_entry_is_fresh_without_early_refresh():
+    entry = CacheEntry(value=[], created=100.0, delta=1.0, expire=30)
+    assert entry.is_fresh(129.9, beta=0)
+    assert not entry.is_fresh(130.0, beta=0)
+
+
+def test_early_refresh_grows_with_compute_time():
+    slow = CacheEntry(value=[], created=100.0, delta=10.0, expire=30)
+    fast = CacheEntry(value=[], created=100.0, delta=0.001, expire=30)
+    slow_refreshes = sum(not slow.is_fresh(125.0, beta=1.0) for _ in range(1000))
+    fast_refreshes = sum(not fast.is_fresh(125.0, beta=1.0) for _ in range(1000))
+    assert fast_refreshes == 0
+    assert slow_refreshes > 100
@@ -0,0 +1,35 @@
+from datetime import date
+
+from app.cache.tags import (
+    ARTICLES_ALL_TAG,
+    ARTICLES_HEAD_TAG,
+    ARTICLES_PAGES_TAG,
+    ARTICLES_SEARCH_TAG,
+    article_write_tags,
+    author_tag,
+    date_tag,
+)
+
+
+def test_update_does_not_touch_pages():
+    tags = article_write_tags(1, "testuser", date(2024, 1, 6))
+    assert tags == {
+        ARTICLES_ALL_TAG,
+        ARTICLES_SEARCH_TAG,
+        "article:1",
+        "author:testuser",
+        "date:2024-01-06",
+    }
+
+
+def test_insert_and_delete_shift_pages():
+    inserted = article_write_tags(1, "testuser", date(2024, 1, 6), inserted=True)
+    deleted = article_write_tags(1, "testuser", date(2024, 1, 6), deleted=True)
+    assert {ARTICLES_PAGES_TAG, ARTICLES_HEAD_TAG} <= inserted
+    assert ARTICLES_PAGES_TAG in deleted
+    assert ARTICLES_HEAD_TAG not in deleted
+
+
+def test_read_and_write_tags_match():
+    assert date_tag("2024-01-06") == date_tag(date(2024, 1, 6))
+    assert author_tag("admin") in article_write_tags(4, "admin", date(2024, 1, 5))
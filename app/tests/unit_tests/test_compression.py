@@ -0,0 +1,29 @@
+import gzip
+
+import pytest
+import zstandard
+
+from app.api.compression import choose_encoding, compress
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, encoding",
+    [
+        (None, None),
+        ("identity", None),
+        ("gzip, deflate", "gzip"),
+        ("gzip, zstd", "zstd"),
+        ("gzip, zstd;q=0.5", "gzip"),
+        ("zstd;q=0, gzip;q=0.1", "gzip"),
+        ("*", "zstd"),
+        ("*, zstd;q=0", "gzip"),
+    ],
+)
+def test_choose_encoding(accept_encoding, encoding):
+    assert choose_encoding(accept_encoding) == encoding
+
+
+def test_compress_round_trip():
+    body = b'{"title": "Title"}' * 100
+    assert gzip.decompress(compress(body, "gzip")) == body
+    assert zstandard.decompress(compress(body, "zstd")) == body
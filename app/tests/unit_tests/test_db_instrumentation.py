@@ -0,0 +1,52 @@
+import logging
+
+import pytest
+from sqlalchemy import create_engine, event, text
+
+from app.core.config import settings
+from app.core.metrics import RequestStats, request_stats
+from app.db import instrumentation
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    event.listen(engine, "before_cursor_execute", instrumentation.before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", instrumentation.after_cursor_execute)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def stats():
+    stats = RequestStats(method="GET")
+    token = request_stats.set(stats)
+    yield stats
+    request_stats.reset(token)
+
+
+def test_statements_counted_per_request(engine, stats):
+    with engine.connect() as conn:
+        for i in range(3):
+            conn.execute(text("SELECT :i"), {"i": i})
+    assert stats.db_queries == 3
+    assert stats.statements == {"SELECT ?": 3}
+    assert stats.route == "<unmatched>"
+
+
+def test_slow_query_logged(engine, stats, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_MS", 0)
+    with caplog.at_level(logging.WARNING), engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    record = next(r for r in caplog.records if r.getMessage() == "Slow query")
+    assert record.statement == "SELECT 1"
+    assert record.method == "GET"
+
+
+def test_n_plus_one_detected(stats, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "DB_N_PLUS_ONE_THRESHOLD", 3)
+    stats.statements = {"SELECT a": 3, "SELECT b": 1}
+    with caplog.at_level(logging.WARNING):
+        instrumentation.check_n_plus_one(stats)
+    warnings = [r for r in caplog.records if r.getMessage() == "Possible N+1 query"]
+    assert [r.statement for r in warnings] == ["SELECT a"]
@@ -0,0 +1,9 @@
+from httpx import AsyncClient
+
+
+async def test_healthcheck(ac: AsyncClient):
+    response = await ac.get("/health")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ok"
+    assert response.json()["pool"]["class"] == "NullPool"
+    assert "hits" in response.json()["cache"]
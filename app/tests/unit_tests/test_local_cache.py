@@ -0,0 +1,54 @@
+import time
+
+from app.api.dao.userdao import USERS_CACHE, user_cache
+from app.cache.l1 import evict
+from app.cache.local import LocalTTLCache
+
+
+def test_lru_eviction():
+    cache = LocalTTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+
+def test_ttl_expiration():
+    cache = LocalTTLCache(maxsize=2, ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+def test_size_limit_and_stats():
+    cache = LocalTTLCache(maxsize=10, ttl=60, maxbytes=100)
+    cache.set("a", 1, size=60)
+    cache.set("b", 2, size=60)
+    cache.set("huge", 3, size=101)
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.get("huge") is None
+    assert cache.stats() == {
+        "items": 1,
+        "size": 60,
+        "hits": 1,
+        "misses": 2,
+        "evictions": 1,
+    }
+
+
+def test_item_ttl():
+    cache = LocalTTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.size == 0
+
+
+def test_evict_from_registered_cache():
+    user_cache.set("testuser", "cached")
+    evict(["testuser"], USERS_CACHE)
+    assert user_cache.get("testuser") is None
@@ -0,0 +1,73 @@
+import io
+import json
+import logging
+import sys
+import time
+
+from app.logger import BatchQueueListener, BoundedQueueHandler, formatter
+
+
+def make_record(msg, *args):
+    return logging.LogRecord("test", logging.INFO, __file__, 1, msg, args, None)
+
+
+def test_full_queue_drops_records():
+    handler = BoundedQueueHandler(queue_size=2, policy="drop", block_timeout=0)
+    for i in range(5):
+        handler.handle(make_record("record %s", i))
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_listener_writes_batch_and_reports_drops():
+    queue_handler = BoundedQueueHandler(queue_size=10, policy="drop", block_timeout=0)
+    stream = io.StringIO()
+    stream_handler = logging.StreamHandler(stream)
+    stream_handler.setFormatter(formatter)
+    listener = BatchQueueListener(queue_handler, stream_handler, batch_size=100)
+    queue_handler.dropped = 2
+    listener.start()
+    queue_handler.handle(make_record("hello %s", "world"))
+    listener.stop()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert lines[0]["message"] == "hello world"
+    assert lines[-1]["message"] == "Log records dropped"
+    assert lines[-1]["dropped"] == 2
+
+
+def test_listener_stops_with_full_queue():
+    queue_handler = BoundedQueueHandler(queue_size=3, policy="drop", block_timeout=0)
+    stream = io.StringIO()
+
+    class SlowHandler(logging.StreamHandler):
+        def format(self, record):
+            time.sleep(0.01)
+            return super().format(record)
+
+    stream_handler = SlowHandler(stream)
+    stream_handler.setFormatter(formatter)
+    listener = BatchQueueListener(queue_handler, stream_handler, batch_size=1)
+    listener.start()
+    for i in range(10):
+        queue_handler.handle(make_record("record %s", i))
+    listener.stop()
+
+    assert listener._thread is None
+    assert "record 0" in stream.getvalue()
+
+
+def test_prepare_keeps_caller_record():
+    handler = BoundedQueueHandler(queue_size=2, policy="drop", block_timeout=0)
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        record = logging.LogRecord(
+            "test", logging.ERROR, __file__, 1, "failed %s", ("x",), sys.exc_info()
+        )
+    handler.handle(record)
+    queued = handler.queue.get_nowait()
+    assert queued is not record
+    assert queued.msg == "failed x" and queued.exc_info is None
+    assert "ZeroDivisionError" in queued.exc_text
+    assert record.args == ("x",) and record.exc_info is not None
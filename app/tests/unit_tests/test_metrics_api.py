@@ -0,0 +1,16 @@
+from httpx import AsyncClient
+
+
+async def test_metrics(ac: AsyncClient):
+    response = await ac.get("/health")
+    assert "X-Process-Time" in response.headers
+
+    response = await ac.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'http_request_duration_seconds_count{method="GET",route="/health",status="200"}'
+        in response.text
+    )
+    db_queries = 'http_request_db_queries_count{method="GET",route="/health"}'
+    assert db_queries in response.text
@@ -0,0 +1,16 @@
+from datetime import date
+
+import pytest
+
+from app.api.dao.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(date(2024, 1, 6), 4)
+    assert decode_cursor(cursor) == (date(2024, 1, 6), 4)
+
+
+@pytest.mark.parametrize("article_id", [0, -1, 10**20])
+def test_cursor_with_id_out_of_range(article_id):
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(date(2024, 1, 1), article_id))
@@ -0,0 +1,11 @@
+from app.api.responses import etag_matches, make_etag
+
+
+def test_etag_matches_if_none_match():
+    etag = make_etag("articles", 7)
+    assert etag == '"articles-7"'
+    assert etag_matches('"articles-7"', etag)
+    assert etag_matches('"articles-6", W/"articles-7"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"articles-6"', etag)
+    assert not etag_matches(None, etag)
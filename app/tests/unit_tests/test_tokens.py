@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+import pytest
+from jose import jwt
+
+from app.api.auth.auth import create_access_token
+from app.api.auth.tokens import decode_token, get_token_verifier, token_cache
+from app.api.exceptions.exceptions import (
+    IncorrectTokenFormatException,
+    TokenExpiredException,
+)
+from app.core.config import settings
+
+
+def expired_token() -> str:
+    expire = datetime.utcnow() - timedelta(minutes=1)
+    return jwt.encode(
+        {"sub": "testuser", "exp": expire}, settings.SECRET_KEY, settings.ALGORITHM
+    )
+
+
+@pytest.mark.parametrize("name", ["jose", "hmac"])
+def test_verifiers(name):
+    verifier = get_token_verifier(name)
+    token = create_access_token({"sub": "testuser"})
+    assert verifier.decode(token)["sub"] == "testuser"
+    with pytest.raises(TokenExpiredException):
+        verifier.decode(expired_token())
+    with pytest.raises(IncorrectTokenFormatException):
+        verifier.decode(token[:-2])
+    with pytest.raises(IncorrectTokenFormatException):
+        verifier.decode("not a token")
+
+
+def test_decode_token_is_cached():
+    token = create_access_token({"sub": "testuser"})
+    hits = token_cache.hits
+    assert decode_token(token)["sub"] == "testuser"
+    assert decode_token(token)["sub"] == "testuser"
+    assert token_cache.hits == hits + 1
+    with pytest.raises(TokenExpiredException):
+        decode_token(expired_token())
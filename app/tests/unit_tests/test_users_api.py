@@ -1,5 +1,10 @@
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import delete
+
+from app.api.dao.userdao import UserDAO
+from app.api.models.user import User
+from app.db.base import async_session_maker
 
 
 @pytest.mark.parametrize(
@@ -39,3 +44,63 @@ async def test_login_user(name, password, status_code, ac: AsyncClient):
         },
     )
     assert response.status_code == status_code
+
+
+async def test_refresh_rotates_token(ac: AsyncClient):
+    response = await ac.post("/login", json={"name": "testuser", "password": "test"})
+    assert response.status_code == 200
+    old_token = ac.cookies["my_journal_refresh_token"]
+
+    response = await ac.post("/refresh")
+    assert response.status_code == 200
+    new_token = ac.cookies["my_journal_refresh_token"]
+    assert new_token != old_token
+
+    response = await ac.get("/sessions")
+    assert response.status_code == 200
+    assert [session["current"] for session in response.json()].count(True) == 1
+
+    # Повторное использование замененного токена отзывает сессию
+    for token in (old_token, new_token):
+        ac.cookies.clear()
+        ac.cookies.set("my_journal_refresh_token", token)
+        response = await ac.post("/refresh")
+        assert response.status_code == 401
+
+
+async def test_refresh_of_deleted_user(ac: AsyncClient):
+    user = {"name": "refreshgone", "email": "gone@example.com", "password": "test"}
+    assert (await ac.post("/register", json=user)).status_code == 201
+    response = await ac.post("/login", json={"name": user["name"], "password": "test"})
+    assert response.status_code == 200
+
+    async with async_session_maker() as session:
+        await session.execute(delete(User).where(User.name == user["name"]))
+        await session.commit()
+    await UserDAO.invalidate_cached(user["name"])
+
+    response = await ac.post("/refresh")
+    assert response.status_code == 401
+    ac.cookies.clear()
+
+
+async def test_logout_needs_session_secret(ac: AsyncClient):
+    response = await ac.post("/login", json={"name": "testuser", "password": "test"})
+    assert response.status_code == 200
+    token = ac.cookies["my_journal_refresh_token"]
+    session_id = token.partition(".")[0]
+
+    ac.cookies.clear()
+    ac.cookies.set("my_journal_refresh_token", f"{session_id}.forged")
+    await ac.post("/logout")
+
+    ac.cookies.clear()
+    ac.cookies.set("my_journal_refresh_token", token)
+    response = await ac.post("/refresh")
+    assert response.status_code == 200
+    ac.cookies.clear()
+
+
+async def test_refresh_without_token(ac: AsyncClient):
+    response = await ac.post("/refresh")
+    assert response.status_code == 401
@@ -24,3 +24,20 @@ async def test_add_new_user():
         role="user",
     )
     assert new_user
+
+
+async def test_find_cached_user_sees_role_change():
+    user = await UserDAO.find_cached("testuser2")
+    assert user.role == "user"
+
+    await UserDAO.update_user("testuser2", role="admin")
+    user = await UserDAO.find_cached("testuser2")
+    assert user.role == "admin"
+
+    await UserDAO.update_user("testuser2", role="user")
+    user = await UserDAO.find_cached("testuser2")
+    assert user.role == "user"
+
+
+async def test_find_cached_user_not_found():
+    assert await UserDAO.find_cached(".....") is None
@@ -0,0 +1,417 @@
+"""
+Нагрузочный бенчмарк маршрутов статей и пользователей: чтения из кэша
+и без него, страницы на разной глубине, вход, обновление токена, сессии
+и запись под авторизацией. Результат - JSON с p50/p95/p99 и RPS по каждому
+сценарию, чтобы сравнивать релизы между собой.
+
+Чтения из кэша идут с Accept-Encoding httpx по умолчанию (gzip), то есть
+отдаются готовыми сжатыми вариантами. Чтения без кэша идут с
+Accept-Encoding: identity, чтобы сжатые варианты их не подменяли.
+DELETE /sessions не измеряется: он отзывал бы сессию клиента бенчмарка.
+
+По умолчанию приложение запускается в этом процессе (httpx + ASGI), нужен
+Postgres из настроек (MODE=DEV или TEST, статьи будут дополнены до --articles).
+Redis берется из настроек или заменяется на fakeredis в памяти (--fake-redis,
+пакет fakeredis). С --url нагрузка идет на запущенный сервер, например
+gunicorn с 4 воркерами; чтения без кэша тогда не измеряются.
+
+Запуск:
+    python -m benchmarks.api_load --articles 100000 --requests 500 > result.json
+    python -m benchmarks.api_load --url http://127.0.0.1:8000 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
+from typing import Callable, Optional
+from unittest import mock
+
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from app.api.auth.auth import get_password_hash
+from app.api.dao.pagination import encode_cursor
+from app.core.config import settings
+from app.db.base import engine
+from benchmarks.article_indexes import seed
+
+BENCH_USER = "bench_user"
+BENCH_PASSWORD = "bench_password"
+PER_PAGE = 10
+PAGE_DEPTHS = (1, 10, 100, 1000)
+BULK_SIZE = 50
+# /articles/all и /articles/export отдают всю таблицу, на больших объемах
+# они измеряют сеть и память, а не API
+FULL_TABLE_LIMIT = 100_000
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    # Номер запроса -> (путь, аргументы httpx)
+    request: Callable[[int], tuple[str, dict]]
+    auth: bool = False
+    cacheable: bool = False
+    status: int = 200
+    # Свое число параллельных запросов, например 1 для /refresh: токен
+    # обновления меняется каждым запросом, и сессию обновляют по очереди
+    concurrency: Optional[int] = None
+    # Ошибки делают замер бессмысленным (например, /refresh с отозванной
+    # сессией измеряет ответы 401), бенчмарк падает
+    strict: bool = False
+
+
+def get(path: str, **params) -> Callable[[int], tuple[str, dict]]:
+    return lambda i: (path, {"params": params})
+
+
+def percentile(timings: list[float], percent: float) -> float:
+    """Ближайший ранг по отсортированному списку"""
+    index = max(0, int(round(percent / 100 * len(timings))) - 1)
+    return round(timings[index], 3)
+
+
+async def seed_data(articles: int) -> dict:
+    """Статьи, пользователь для входа и курсоры страниц на разной глубине"""
+    async with engine.begin() as conn:
+        await seed(conn, articles)
+        await conn.execute(
+            text(
+                'INSERT INTO "user" (name, email, hashed_password, role)'
+                " VALUES (:name, 'bench_user@example.com', :password, 'user')"
+                " ON CONFLICT (name) DO UPDATE SET hashed_password = :password"
+            ),
+            {"name": BENCH_USER, "password": get_password_hash(BENCH_PASSWORD)},
+        )
+        total = (await conn.execute(text("SELECT count(*) FROM article"))).scalar()
+        article_id = (
+            await conn.execute(text("SELECT max(id) FROM article"))
+        ).scalar()
+        cursors = {}
+        for depth in PAGE_DEPTHS:
+            row = (
+                await conn.execute(
+                    text(
+                        "SELECT publication_date, id FROM article"
+                        " ORDER BY publication_date DESC, id DESC"
+                        " OFFSET :offset LIMIT 1"
+                    ),
+                    {"offset": (depth - 1) * PER_PAGE},
+                )
+            ).first()
+            if row is not None:
+                cursors[depth] = encode_cursor(row.publication_date, row.id)
+    return {"total": total, "cursors": cursors, "article_id": article_id}
+
+
+def read_scenarios(data: dict) -> list[Scenario]:
+    scenarios = [
+        Scenario(
+            "articles_by_author",
+            "GET",
+            get("/articles/articles", author_name="bench_author_42"),
+        ),
+        Scenario(
+            "articles_by_date",
+            "GET",
+            get("/articles/articles", publication_date="2020-06-15"),
+        ),
+        Scenario(
+            "sort_by_author", "GET", get("/articles/sort_by_author/bench_author_42")
+        ),
+        Scenario("sort_by_date", "GET", get("/articles/sort_by_date/2020-06-15")),
+        Scenario("search_word", "GET", get("/articles/search", q="lorem")),
+        Scenario("search_phrase", "GET", get("/articles/search", q='"Title 42"')),
+        Scenario("article_by_id", "GET", get(f"/articles/id/{data['article_id']}")),
+        Scenario(
+            "summary_by_author",
+            "GET",
+            get("/articles/summary/by_author/bench_author_42", excerpt=200),
+        ),
+        Scenario(
+            "summary_by_date", "GET", get("/articles/summary/by_date/2020-06-15")
+        ),
+    ]
+    for depth in PAGE_DEPTHS:
+        scenarios.append(
+            Scenario(
+                f"page_{depth}",
+                "GET",
+                get("/articles/page", page=depth, per_page=PER_PAGE),
+            )
+        )
+        scenarios.append(
+            Scenario(
+                f"summary_page_{depth}",
+                "GET",
+                get("/articles/summary/page", page=depth, per_page=PER_PAGE),
+            )
+        )
+        scenarios.append(
+            Scenario(
+                f"articles_page_{depth}",
+                "GET",
+                get("/articles/articles", page=depth, per_page=PER_PAGE),
+            )
+        )
+        if depth in data["cursors"]:
+            cursor = data["cursors"][depth]
+            scenarios.append(
+                Scenario(
+                    f"cursor_page_{depth}",
+                    "GET",
+                    get("/articles/cursor_page", cursor=cursor, per_page=PER_PAGE),
+                )
+            )
+            scenarios.append(
+                Scenario(
+                    f"summary_cursor_page_{depth}",
+                    "GET",
+                    get(
+                        "/articles/summary/cursor_page",
+                        cursor=cursor,
+                        per_page=PER_PAGE,
+                    ),
+                )
+            )
+    if data["total"] <= FULL_TABLE_LIMIT:
+        scenarios += [
+            Scenario("all", "GET", get("/articles/all")),
+            Scenario("summary_all", "GET", get("/articles/summary/all")),
+            Scenario("articles", "GET", get("/articles/articles")),
+            Scenario("export_ndjson", "GET", get("/articles/export", format="ndjson")),
+        ]
+    for scenario in scenarios:
+        # Выгрузка не кэшируется, остальные чтения - да
+        scenario.cacheable = not scenario.name.startswith("export")
+    return scenarios
+
+
+def user_scenarios() -> list[Scenario]:
+    login = {"name": BENCH_USER, "password": BENCH_PASSWORD}
+
+    def register(i):
+        name = f"bench_{uuid.uuid4().hex}"
+        return "/register", {
+            "json": {"name": name, "email": f"{name}@example.com", "password": "x"}
+        }
+
+    # refresh и sessions идут до login: каждый вход добавляет сессию того же
+    # пользователя, и после MAX_SESSIONS_PER_USER вытесняется самая старая -
+    # сессия авторизованного клиента
+    return [
+        Scenario(
+            "refresh",
+            "POST",
+            lambda i: ("/refresh", {}),
+            auth=True,
+            concurrency=1,
+            strict=True,
+        ),
+        Scenario("sessions", "GET", lambda i: ("/sessions", {}), auth=True),
+        Scenario("login", "POST", lambda i: ("/login", {"json": login})),
+        Scenario("register", "POST", register, status=201),
+        Scenario("logout", "POST", lambda i: ("/logout", {})),
+    ]
+
+
+def write_scenarios(created: list[int]) -> list[Scenario]:
+    """
+    Создание складывает id в `created`, изменение и удаление берут их оттуда,
+    поэтому сценарии выполняются по порядку.
+    """
+    article = {"title": "Benchmark", "contents": "Lorem ipsum " * 50}
+
+    def edit(i):
+        return f"/articles/edit/{created[i % len(created)]}", {"json": article}
+
+    def delete(i):
+        return f"/articles/delete/{created.pop()}", {}
+
+    def bulk_edit(i):
+        start = i * BULK_SIZE % len(created)
+        ids = created[start:start + BULK_SIZE]
+        return "/articles/bulk/edit", {"json": [{"id": id, **article} for id in ids]}
+
+    def bulk_delete(i):
+        ids = [created.pop() for _ in range(min(BULK_SIZE, len(created)))]
+        return "/articles/bulk/delete", {"json": ids}
+
+    return [
+        Scenario(
+            "create",
+            "POST",
+            lambda i: ("/articles/create", {"json": article}),
+            auth=True,
+            status=201,
+        ),
+        Scenario(
+            "bulk_create",
+            "POST",
+            lambda i: ("/articles/bulk/create", {"json": [article] * BULK_SIZE}),
+            auth=True,
+            status=201,
+        ),
+        Scenario("edit", "PUT", edit, auth=True),
+        Scenario("bulk_edit", "PUT", bulk_edit, auth=True),
+        Scenario("bulk_delete", "POST", bulk_delete, auth=True),
+        Scenario("delete", "DELETE", delete, auth=True),
+    ]
+
+
+async def run(
+    client: AsyncClient,
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+    headers: Optional[dict] = None,
+) -> tuple[dict, list]:
+    timings, errors, bodies = [], 0, []
+    counter = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            path, kwargs = scenario.request(i)
+            start = time.perf_counter()
+            response = await client.request(
+                scenario.method, path, headers=headers, **kwargs
+            )
+            timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code != scenario.status:
+                errors += 1
+            elif scenario.method == "POST" and scenario.name.endswith("create"):
+                bodies.append(response.json())
+
+    started = time.perf_counter()
+    concurrency = scenario.concurrency or concurrency
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    timings.sort()
+    return {
+        "requests": len(timings),
+        "errors": errors,
+        "rps": round(len(timings) / elapsed, 1),
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": percentile(timings, 95),
+        "p99_ms": percentile(timings, 99),
+        "max_ms": round(timings[-1], 3),
+    }, bodies
+
+
+def set_cache_enabled(enabled: bool) -> None:
+    """Пересоздает FastAPICache с тем же бэкендом (только в этом процессе)"""
+    from fastapi_cache import FastAPICache
+
+    from app.cache.l1 import l1_cache
+
+    backend, prefix = FastAPICache.get_backend(), FastAPICache.get_prefix()
+    coder = FastAPICache.get_coder()
+    FastAPICache.reset()
+    FastAPICache.init(backend, prefix=prefix, coder=coder, enable=enabled)
+    l1_cache.clear()
+
+
+async def benchmark(args) -> dict:
+    assert settings.MODE != "PROD", "Бенчмарк дописывает данные, не запускайте на PROD"
+    data = await seed_data(args.articles)
+    report = {
+        "articles": data["total"],
+        "target": args.url or "asgi",
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "scenarios": {},
+    }
+
+    async with AsyncExitStack() as stack:
+        if args.url:
+            base_url, app = args.url, None
+        else:
+            from asgi_lifespan import LifespanManager
+
+            from app.main import app
+
+            base_url = "http://bench"
+            if args.fake_redis:
+                from fakeredis.aioredis import FakeRedis
+
+                fake_redis = mock.patch(
+                    "app.main.aioredis.from_url", lambda *args, **kwargs: FakeRedis()
+                )
+                stack.enter_context(fake_redis)
+            await stack.enter_async_context(LifespanManager(app))
+
+        def client() -> AsyncClient:
+            return AsyncClient(app=app, base_url=base_url, timeout=60)
+
+        anonymous = await stack.enter_async_context(client())
+        authorized = await stack.enter_async_context(client())
+        response = await authorized.post(
+            "/login", json={"name": BENCH_USER, "password": BENCH_PASSWORD}
+        )
+        response.raise_for_status()
+
+        async def measure(
+            name: str, scenario: Scenario, requests: int, headers: dict = None
+        ) -> list:
+            session = authorized if scenario.auth else anonymous
+            result, bodies = await run(
+                session, scenario, requests, args.concurrency, headers
+            )
+            report["scenarios"][name] = result
+            if scenario.strict and result["errors"]:
+                raise RuntimeError(f"{name}: {result['errors']} errors")
+            return bodies
+
+        for scenario in read_scenarios(data):
+            if not scenario.cacheable:
+                await measure(scenario.name, scenario, args.requests)
+                continue
+            # Первый запрос заполняет кэш
+            path, kwargs = scenario.request(0)
+            await anonymous.request(scenario.method, path, **kwargs)
+            await measure(f"{scenario.name}:cached", scenario, args.requests)
+            if app is not None:
+                set_cache_enabled(False)
+                await measure(
+                    f"{scenario.name}:uncached",
+                    scenario,
+                    args.requests,
+                    headers={"Accept-Encoding": "identity"},
+                )
+                set_cache_enabled(True)
+
+        for scenario in user_scenarios():
+            await measure(scenario.name, scenario, args.requests)
+
+        created = []
+        for scenario in write_scenarios(created):
+            bulk = scenario.name.startswith("bulk")
+            requests = max(1, args.requests // BULK_SIZE) if bulk else args.requests
+            if scenario.name in ("delete", "bulk_delete"):
+                requests = min(requests, len(created) // (BULK_SIZE if bulk else 1))
+            elif not created and scenario.name in ("edit", "bulk_edit"):
+                requests = 0
+            if requests == 0:
+                continue
+            for body in await measure(scenario.name, scenario, requests):
+                created.extend(
+                    item["id"] for item in (body if isinstance(body, list) else [body])
+                )
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--url", help="Адрес запущенного сервера вместо ASGI")
+    parser.add_argument("--fake-redis", action="store_true")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(benchmark(args)), indent=2))
@@ -0,0 +1,130 @@
+"""
+Сравнение планов и задержек запросов ArticleDAO без индексов и с индексами
+из миграций 87c76649540f и 4ece80d1b03c.
+
+Запуск на отдельной базе (MODE=DEV или TEST, данные статей будут дополнены):
+    python -m benchmarks.article_indexes --rows 1000000 --repeat 50 > result.json
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import date
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.base import engine
+
+AUTHORS = 1000
+DAYS = 3650
+
+QUERIES = {
+    "find_by_author": (
+        "SELECT * FROM article WHERE author = :author",
+        {"author": "bench_author_42"},
+    ),
+    "find_by_date": (
+        "SELECT * FROM article WHERE publication_date = :publication_date",
+        {"publication_date": date(2020, 6, 15)},
+    ),
+    "author_page": (
+        "SELECT * FROM article WHERE author = :author"
+        " ORDER BY publication_date DESC, id DESC LIMIT 11",
+        {"author": "bench_author_42"},
+    ),
+    "author_count": (
+        "SELECT count(*) FROM article WHERE author = :author",
+        {"author": "bench_author_42"},
+    ),
+    "cursor_page": (
+        "SELECT * FROM article WHERE (publication_date, id) < (:publication_date, :id)"
+        " ORDER BY publication_date DESC, id DESC LIMIT 10",
+        {"publication_date": date(2020, 6, 15), "id": 500000},
+    ),
+}
+
+CREATE_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_article_author_publication_date_id"
+    " ON article (author, publication_date, id)",
+    "CREATE INDEX IF NOT EXISTS ix_article_publication_date_id"
+    " ON article (publication_date, id)",
+]
+DROP_INDEXES = [
+    "DROP INDEX IF EXISTS ix_article_author",
+    "DROP INDEX IF EXISTS ix_article_author_publication_date_id",
+    "DROP INDEX IF EXISTS ix_article_publication_date_id",
+]
+
+
+async def seed(conn, rows: int):
+    await conn.execute(
+        text(
+            "INSERT INTO \"user\" (name, email, hashed_password, role)"
+            " SELECT 'bench_author_' || i, 'bench' || i || '@example.com', '-', 'user'"
+            " FROM generate_series(0, :authors - 1) AS i ON CONFLICT DO NOTHING"
+        ),
+        {"authors": AUTHORS},
+    )
+    existing = (await conn.execute(text("SELECT count(*) FROM article"))).scalar()
+    if existing < rows:
+        await conn.execute(
+            text(
+                "INSERT INTO article (title, contents, publication_date, author)"
+                " SELECT 'Title ' || i, repeat('Lorem ipsum ', 50),"
+                " DATE '2015-01-01' + (i % :days),"
+                " 'bench_author_' || (i % :authors)"
+                " FROM generate_series(1, :count) AS i"
+            ),
+            {"days": DAYS, "authors": AUTHORS, "count": rows - existing},
+        )
+    await conn.execute(text("ANALYZE article"))
+
+
+async def measure(conn, repeat: int) -> dict:
+    results = {}
+    for name, (sql, params) in QUERIES.items():
+        plan = (
+            await conn.execute(
+                text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params
+            )
+        ).scalar()
+        # asyncpg отдает json как строку
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            await conn.execute(text(sql), params)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        results[name] = {
+            "plan": plan[0]["Plan"]["Node Type"],
+            "execution_ms": plan[0]["Execution Time"],
+            "p50_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(timings[int(len(timings) * 0.95) - 1], 3),
+        }
+    return results
+
+
+async def main(rows: int, repeat: int):
+    assert settings.MODE != "PROD", "Бенчмарк удаляет индексы, не запускайте на PROD"
+    async with engine.begin() as conn:
+        await seed(conn, rows)
+    report = {"rows": rows}
+    for phase, statements in (("before", DROP_INDEXES), ("after", CREATE_INDEXES)):
+        async with engine.begin() as conn:
+            for statement in statements:
+                await conn.execute(text(statement))
+            await conn.execute(text("ANALYZE article"))
+            report[phase] = await measure(conn, repeat)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
@@ -0,0 +1,45 @@
+"""
+Микробенчмарк проверки токена доступа в get_current_user: каждая реализация
+JWT_VERIFIER без кэша (как было до кэша токенов - jose на каждый запрос)
+и decode_token с кэшем проверенных токенов.
+
+Запуск:
+    python -m benchmarks.auth_overhead --repeat 20000
+"""
+import argparse
+import json
+import time
+
+from app.api.auth.auth import create_access_token
+from app.api.auth.tokens import VERIFIERS, decode_token, get_token_verifier
+
+
+def timeit(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1_000_000
+
+
+def main(repeat: int):
+    token = create_access_token({"sub": "bench_user"})
+    report = {"repeat": repeat}
+    for name in VERIFIERS:
+        try:
+            verifier = get_token_verifier(name)
+        except (ImportError, ValueError) as e:
+            report[f"{name}_us"] = f"unavailable: {e}"
+            continue
+        report[f"{name}_us"] = round(timeit(lambda: verifier.decode(token), repeat), 2)
+    decode_token(token)
+    report["cached_us"] = round(timeit(lambda: decode_token(token), repeat), 2)
+    if isinstance(report["jose_us"], float):
+        report["speedup"] = round(report["jose_us"] / report["cached_us"], 1)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.repeat)
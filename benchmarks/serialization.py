@@ -0,0 +1,86 @@
+"""
+Микробенчмарк отрисовки списка статей: стандартный путь FastAPI
+(ORM-объекты -> валидация response_model -> jsonable_encoder -> json)
+против быстрого пути (строки БД -> orjson без повторной валидации).
+
+Запуск:
+    python -m benchmarks.serialization --articles 1000 --repeat 50
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import date
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.api.models.article import Article
+from app.api.models.schemas import SArticle
+from app.api.models.user import User  # noqa
+from app.core.serialization import dumps
+
+
+def make_rows(count: int) -> list[dict]:
+    return [
+        {
+            "id": i,
+            "title": f"Заголовок {i}",
+            "contents": "Текст статьи " * 100,
+            "publication_date": date(2024, 1, 1 + i % 28),
+            "author": f"author_{i % 50}",
+        }
+        for i in range(count)
+    ]
+
+
+async def fastapi_default(articles: list[Article], field) -> bytes:
+    content = await serialize_response(
+        field=field, response_content=articles, is_coroutine=True
+    )
+    return JSONResponse(content).body
+
+
+def fast_path(rows: list[dict]) -> bytes:
+    return dumps(rows)
+
+
+async def timeit(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+        if asyncio.iscoroutine(result):
+            await result
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+async def main(count: int, repeat: int):
+    rows = make_rows(count)
+    articles = [Article(**row) for row in rows]
+    field = create_response_field(name="Response", type_=list[SArticle])
+
+    assert json.loads(await fastapi_default(articles, field)) == json.loads(
+        fast_path(rows)
+    )
+    default_ms = await timeit(lambda: fastapi_default(articles, field), repeat)
+    fast_ms = await timeit(lambda: fast_path(rows), repeat)
+    print(
+        json.dumps(
+            {
+                "articles": count,
+                "fastapi_default_ms": round(default_ms, 3),
+                "orjson_fast_path_ms": round(fast_ms, 3),
+                "speedup": round(default_ms / fast_ms, 1),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--articles", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.articles, args.repeat))
@@ -0,0 +1,21 @@
+import os
+import shutil
+import tempfile
+
+# Воркеры пишут метрики в файлы этого каталога, /metrics собирает их вместе.
+# Переменная должна быть задана до импорта prometheus_client в воркерах.
+metrics_dir = os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "myjournal_metrics")
+)
+
+
+def on_starting(server):
+    # Метрики прошлого запуска не должны попасть в новые
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)